@@ -16,10 +16,14 @@ logger = logging.getLogger('shiftsync')
 
 router = APIRouter()
 
+# Anything outside word characters, hyphen and dot is replaced in filenames
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\-.]')
+
 
 def sanitize_filename(name: str) -> str:
     """Sanitize a string for safe use in HTTP headers and filenames."""
-    return re.sub(r'[^\w\-.]', '_', name)[:50]
+    # Replacement is one-for-one, so truncating first gives the same result
+    return _UNSAFE_FILENAME_CHARS.sub('_', name[:50])
 
 
 @router.post("/generate-calendar")
@@ -26,8 +26,19 @@ ALLOWED_REDIRECT_HOSTS = {
 }
 
 
+# "scheme://host/" for every allowed host: a URL starting with one of these
+# has exactly that scheme and hostname, so it can skip urlparse
+_ALLOWED_REDIRECT_PREFIXES = tuple(
+    f"{scheme}://{host}/" for scheme in ("https", "http") for host in sorted(ALLOWED_REDIRECT_HOSTS)
+)
+
+
 def _validate_redirect_url(v: str) -> str:
     """Validate that redirect URLs point to allowed hosts to prevent open redirect."""
+    if v.startswith(_ALLOWED_REDIRECT_PREFIXES):
+        return v
+
+    # Ports, missing paths, upper-case schemes etc. go through the full parse
     try:
         parsed = urlparse(v)
         hostname = parsed.hostname or ""
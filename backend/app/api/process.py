@@ -13,7 +13,7 @@ from openai import RateLimitError, APITimeoutError
 from app.models import ProcessRequest, ProcessResponse
 from app.storage.blob_storage import get_storage_service
 from app.ocr.processor import VaktplanProcessor
-from app.ocr.vision_processor import VisionProcessor
+from app.ocr.vision_processor import get_vision_processor
 from app.ocr.confidence_scorer import assign_individual_confidences, generate_warnings
 from app.database import log_processing_result
 from app.config import settings
@@ -45,8 +45,6 @@ async def process_upload(request: Request, body: ProcessRequest):
         )
 
     ocr_engine = body.method  # "ocr" or "ai"
-    vision_proc = None
-
     try:
         logger.info("Processing method: %s", body.method.upper())
 
@@ -62,7 +60,7 @@ async def process_upload(request: Request, body: ProcessRequest):
             logger.info("Using GPT-4 Vision processor")
 
             try:
-                vision_proc = VisionProcessor(api_key=settings.openai_api_key)
+                vision_proc = get_vision_processor(settings.openai_api_key)
 
                 # Vision processor returns (shifts, confidence) - no ocr_text
                 shifts, overall_confidence = await asyncio.to_thread(
@@ -184,10 +182,6 @@ async def process_upload(request: Request, body: ProcessRequest):
         )
 
     finally:
-        # Clean up vision processor httpx client
-        if vision_proc is not None:
-            vision_proc.close()
-
         if file_path and os.path.exists(file_path):
             try:
                 os.unlink(file_path)
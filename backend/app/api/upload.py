@@ -5,11 +5,14 @@ import logging
 import uuid
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, UploadFile, File, Request, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Request, HTTPException
 from fastapi.responses import JSONResponse
 
 from app.models import UploadResponse, QuotaExceededResponse
-from app.security import limiter, validate_file, get_user_identifier, get_country_code, scan_file_for_malware
+from app.security import (
+    limiter, validate_file, get_user_identifier, get_country_code,
+    get_malware_scanner, MalwareScanner,
+)
 from app.storage.blob_storage import get_storage_service
 from app.database import log_upload, deduct_credit
 
@@ -22,7 +25,11 @@ storage = get_storage_service()
 
 @router.post("/upload", response_model=UploadResponse)
 @limiter.limit("10/minute")
-async def upload_file(request: Request, file: UploadFile = File(...)):
+async def upload_file(
+    request: Request,
+    file: UploadFile = File(...),
+    scan_file_for_malware: MalwareScanner = Depends(get_malware_scanner),
+):
     """
     Upload shift schedule file for processing.
     
@@ -4,6 +4,7 @@ FastAPI main application with security middleware and routing.
 import re
 import time
 from collections import defaultdict
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,7 +14,7 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from app.config import settings
-from app.security import limiter
+from app.security import limiter, upload_exceeds_size_limit
 from app.logging_config import setup_logging, setup_sentry, logger
 
 # Initialize logging and error tracking
@@ -21,13 +22,45 @@ setup_logging(log_level="DEBUG" if settings.environment == "development" else "I
 setup_sentry()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize background tasks on startup and release shared clients on shutdown."""
+    logger.info("ShiftSync API starting up...")
+
+    # Create tables if they don't exist (idempotent)
+    from app.database import init_db, AsyncSessionLocal
+    from sqlalchemy import text
+    try:
+        await init_db()
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("SELECT 1"))
+        logger.info("Database connection verified, tables ready")
+    except Exception as e:
+        logger.error("Database connection failed at startup: %s", e)
+
+    # Start cleanup scheduler
+    if settings.environment == "production":
+        from app.cleanup import start_cleanup_scheduler
+        start_cleanup_scheduler()
+        logger.info("File cleanup scheduler started")
+    else:
+        logger.info("Cleanup scheduler disabled in development")
+
+    yield
+
+    # Close the shared OpenAI client (see get_vision_processor)
+    from app.ocr.vision_processor import close_vision_processor
+    close_vision_processor()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="ShiftSync API",
     description="OCR-based shift schedule converter with smart learning",
     version="1.0.0",
     docs_url="/docs" if settings.environment != "production" else None,  # Hide docs in production
-    redoc_url="/redoc" if settings.environment != "production" else None
+    redoc_url="/redoc" if settings.environment != "production" else None,
+    lifespan=lifespan,
 )
 
 # Add rate limiter with response headers
@@ -41,6 +74,19 @@ if settings.environment == "production":
     app.add_middleware(HTTPSRedirectMiddleware)
 
 
+# Upload size preflight (registered before CORS so 413s still carry CORS headers)
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized uploads from Content-Length before the body is parsed."""
+    if request.method == "POST" and request.url.path == "/api/upload":
+        if upload_exceeds_size_limit(request.headers.get("content-length")):
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"File too large. Maximum size: {settings.max_file_size_mb}MB"},
+            )
+    return await call_next(request)
+
+
 # CORS middleware
 allowed_origins = [settings.frontend_url]
 if settings.environment == "production":
@@ -203,32 +249,6 @@ async def root():
 # Import and include routers
 from app.api import upload, process, download, analytics, feedback, payment
 from app import health
-from app.cleanup import start_cleanup_scheduler
-
-
-# Startup event - initialize background tasks
-@app.on_event("startup")
-async def startup_event():
-    """Initialize background tasks on application startup."""
-    logger.info("ShiftSync API starting up...")
-
-    # Create tables if they don't exist (idempotent)
-    from app.database import init_db, AsyncSessionLocal
-    from sqlalchemy import text
-    try:
-        await init_db()
-        async with AsyncSessionLocal() as session:
-            await session.execute(text("SELECT 1"))
-        logger.info("Database connection verified, tables ready")
-    except Exception as e:
-        logger.error("Database connection failed at startup: %s", e)
-
-    # Start cleanup scheduler
-    if settings.environment == "production":
-        start_cleanup_scheduler()
-        logger.info("File cleanup scheduler started")
-    else:
-        logger.info("Cleanup scheduler disabled in development")
 
 app.include_router(upload.router, prefix="/api", tags=["upload"])
 app.include_router(process.router, prefix="/api", tags=["process"])
@@ -55,11 +55,8 @@ class Shift(BaseModel):
     @field_validator('date')
     @classmethod
     def validate_date(cls, v):
-        """Validate date format and values."""
-        parts = v.split('.')
-        if len(parts) != 3:
-            raise ValueError('Date must be in DD.MM.YYYY format')
-        day, month, year = map(int, parts)
+        """Validate date values (the field pattern has already enforced DD.MM.YYYY)."""
+        day, month, year = int(v[:2]), int(v[3:5]), int(v[6:])
         current_year = datetime.now().year
         if not (1 <= day <= 31 and 1 <= month <= 12 and current_year - 2 <= year <= current_year + 5):
             raise ValueError('Invalid date values')
@@ -2,20 +2,53 @@
 Calendar generation from shift data.
 Decoupled from OCR processor to avoid Tesseract dependency for calendar endpoints.
 """
+import io
 import logging
-import re
+import os
 import uuid
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Tuple
 from zoneinfo import ZoneInfo
 
-from icalendar import Calendar, Event
 import nh3
 
 from app.models import Shift
 
 logger = logging.getLogger('shiftsync')
 
+_OSLO_TZ = ZoneInfo("Europe/Oslo")
+
+# Fixed calendar lines (RFC 5545 content lines, CRLF-terminated), pre-encoded
+_CALENDAR_HEADER = (
+    b'BEGIN:VCALENDAR\r\n'
+    b'VERSION:2.0\r\n'
+    b'PRODID:-//ShiftSync//OCR to iCal//NO\r\n'
+    b'CALSCALE:GREGORIAN\r\n'
+)
+_CALENDAR_FOOTER = b'END:VCALENDAR\r\n'
+_EVENT_BEGIN = b'BEGIN:VEVENT\r\n'
+_EVENT_END = b'END:VEVENT\r\n'
+
+# RFC 5545 TEXT escaping (section 3.3.11); summary and description never carry \r
+_TEXT_ESCAPES = str.maketrans({'\\': '\\\\', ';': '\\;', ',': '\\,', '\n': '\\n'})
+
+# Description label per shift type (the Shift model only admits these four)
+_SHIFT_TYPE_LABELS = {
+    shift_type: shift_type.capitalize() for shift_type in ('tidlig', 'mellom', 'kveld', 'natt')
+}
+
+# Content lines are folded so no physical line exceeds 75 octets including the leading space
+_FOLD_LIMIT = 75
+_FOLD_SEP = '\r\n '
+
+# Characters nh3 rewrites in tag-free text; without them the HTML parse is a no-op
+_MARKUP_CHARS = frozenset('<>&\xa0')
+
+# Angle brackets and control characters except \t, \n, \r (those are whitespace-normalized)
+_STRIP_TABLE = dict.fromkeys(
+    [*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), 0x7f, ord('<'), ord('>')]
+)
+
 
 def sanitize_calendar_text(text: str, max_length: int = 100) -> str:
     """
@@ -32,14 +65,20 @@ def sanitize_calendar_text(text: str, max_length: int = 100) -> str:
     if not text:
         return ""
 
-    # Remove all HTML tags and JavaScript
-    clean = nh3.clean(text, tags=set())
+    # Fast path: short printable ASCII without markup or extra spaces is already clean
+    if (len(text) <= max_length and text.isascii() and text.isprintable()
+            and _MARKUP_CHARS.isdisjoint(text) and '  ' not in text
+            and text[0] != ' ' and text[-1] != ' '):
+        return text
 
-    # Remove any remaining angle brackets
-    clean = re.sub(r'[<>]', '', clean)
+    # Remove all HTML tags and JavaScript (skipped when there is no markup to parse)
+    if _MARKUP_CHARS.isdisjoint(text):
+        clean = text
+    else:
+        clean = nh3.clean(text, tags=set())
 
-    # Remove control characters except newlines
-    clean = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', clean)
+    # Remove any remaining angle brackets and control characters in one pass
+    clean = clean.translate(_STRIP_TABLE)
 
     # Normalize whitespace
     clean = ' '.join(clean.split())
@@ -67,60 +106,98 @@ def generate_ics(shifts: List[Shift], owner_name: str) -> bytes:
     if not safe_name:
         safe_name = "Ansatt"
 
-    calendar = Calendar()
-    calendar.add('prodid', '-//ShiftSync//OCR to iCal//NO')
-    calendar.add('version', '2.0')
-    calendar.add('calscale', 'GREGORIAN')
-    calendar.add('x-wr-calname', f'Vakter - {safe_name}')
-
-    for shift in shifts:
-        event = _create_event(shift, safe_name)
-        calendar.add_component(event)
-
-    return calendar.to_ical()
-
-
-def _create_event(shift: Shift, owner_name: str) -> Event:
+    return _emit_ics(shifts, safe_name)
+
+
+def _emit_ics(shifts: List[Shift], owner_name: str) -> bytes:
+    """Serialize shifts as an RFC 5545 calendar with a fixed VEVENT shape."""
+    buf = io.BytesIO()
+    write = buf.write
+    write(_CALENDAR_HEADER)
+    write(_fold(f'X-WR-CALNAME:{_escape_text(f"Vakter - {owner_name}")}').encode('utf-8'))
+
+    # SUMMARY only varies by shift type, so escape, fold and encode it once per type
+    summaries = {
+        shift_type: _fold(f'SUMMARY:{_escape_text(f"{owner_name} jobber {shift_type}")}').encode('utf-8')
+        for shift_type in _SHIFT_TYPE_LABELS
+    }
+
+    for shift, uid in zip(shifts, _uuid4_batch(len(shifts))):
+        shift_type = shift.shift_type
+        start_dt, end_dt = _shift_bounds(shift)
+        # Only the fixed text's newlines need escaping; times and labels contain no specials
+        description = (
+            f'DESCRIPTION:Vakt importert fra vaktplan-bilde via OCR\\n'
+            f'Tid: {shift.start_time} - {shift.end_time}\\n'
+            f'Type: {_SHIFT_TYPE_LABELS[shift_type]}'
+        )
+        write(_EVENT_BEGIN)
+        write(summaries[shift_type])
+        write(
+            f'DTSTART;TZID=Europe/Oslo:{start_dt:%Y%m%dT%H%M%S}\r\n'
+            f'DTEND;TZID=Europe/Oslo:{end_dt:%Y%m%dT%H%M%S}\r\n'
+            f'UID:{uid}@shiftsync.no\r\n'
+            f'{_fold(description)}'.encode('utf-8')
+        )
+        write(_EVENT_END)
+
+    write(_CALENDAR_FOOTER)
+    return buf.getvalue()
+
+
+def _uuid4_batch(count: int) -> List[uuid.UUID]:
+    """Random (version 4) UUIDs, drawing the entropy for all of them in one os.urandom call."""
+    rand = os.urandom(16 * count)
+    return [uuid.UUID(bytes=rand[i:i + 16], version=4) for i in range(0, 16 * count, 16)]
+
+
+def _escape_text(value: str) -> str:
+    """Escape a TEXT property value."""
+    return value.translate(_TEXT_ESCAPES)
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets and terminate it with CRLF."""
+    if line.isascii():
+        step = _FOLD_LIMIT - 1
+        return _FOLD_SEP.join(line[i:i + step] for i in range(0, len(line), step)) + '\r\n'
+
+    # Multi-byte UTF-8: never split inside a character
+    chars = []
+    octets = 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        octets += width
+        if octets >= _FOLD_LIMIT:
+            chars.append(_FOLD_SEP)
+            octets = width
+        chars.append(char)
+    chars.append('\r\n')
+    return ''.join(chars)
+
+
+def _shift_bounds(shift: Shift) -> Tuple[datetime, datetime]:
     """
-    Create iCalendar event from shift.
+    Resolve a shift to timezone-aware start and end datetimes.
 
     Args:
         shift: Shift object
-        owner_name: Name of shift owner
 
     Returns:
-        iCalendar Event object
+        Tuple of (start, end) datetimes in Europe/Oslo
     """
-    tz = ZoneInfo("Europe/Oslo")
-
-    # Parse start datetime with timezone
-    start_dt = datetime.strptime(
-        f"{shift.date} {shift.start_time}",
-        "%d.%m.%Y %H:%M"
-    ).replace(tzinfo=tz)
-
-    # Parse end time
-    end_time_obj = datetime.strptime(shift.end_time, "%H:%M")
-
-    # Calculate end datetime (handle midnight crossing)
-    if end_time_obj.hour < start_dt.hour or \
-       (end_time_obj.hour == start_dt.hour and end_time_obj.minute < start_dt.minute):
-        # Crosses midnight - add 1 day
-        end_dt = start_dt + timedelta(days=1)
-        end_dt = end_dt.replace(hour=end_time_obj.hour, minute=end_time_obj.minute)
-    else:
-        # Same day
-        end_dt = start_dt.replace(hour=end_time_obj.hour, minute=end_time_obj.minute)
-
-    # Create event
-    event = Event()
-    event.add('summary', f"{owner_name} jobber {shift.shift_type}")
-    event.add('dtstart', start_dt)
-    event.add('dtend', end_dt)
-    event.add('description',
-              f'Vakt importert fra vaktplan-bilde via OCR\n'
-              f'Tid: {shift.start_time} - {shift.end_time}\n'
-              f'Type: {shift.shift_type.capitalize()}')
-    event.add('uid', f'{uuid.uuid4()}@shiftsync.no')
-
-    return event
+    # Fixed-position fields (the Shift model enforces DD.MM.YYYY and HH:MM)
+    date, start, end = shift.date, shift.start_time, shift.end_time
+    start_hour, start_min = int(start[:2]), int(start[3:])
+    end_hour, end_min = int(end[:2]), int(end[3:])
+
+    start_dt = datetime(
+        int(date[6:]), int(date[3:5]), int(date[:2]), start_hour, start_min, tzinfo=_OSLO_TZ
+    )
+    end_dt = start_dt.replace(hour=end_hour, minute=end_min)
+
+    # Handle midnight crossing: an end before the start is on the next day
+    if (end_hour, end_min) < (start_hour, start_min):
+        end_dt += timedelta(days=1)
+
+    return start_dt, end_dt
@@ -3,7 +3,9 @@ OCR processor for shift schedule images.
 Refactored from vaktplan_konverter.py into modular OOP structure.
 """
 import logging
-from typing import List, Tuple, Optional
+from itertools import accumulate
+from operator import mul
+from typing import List, Optional, Set, Tuple
 from PIL import Image, ImageFilter, ImageOps
 import pytesseract
 import re
@@ -13,6 +15,35 @@ from app.models import Shift
 
 logger = logging.getLogger('shiftsync')
 
+# One pass over the lowercased OCR text finds both kinds of line:
+#   month header: "desember 2025"
+#   shift line:   weekday HH:MM - HH:MM followed by the day number
+# Handles space in day numbers (e.g., "2 3" -> 23)
+# \d\s+\d must come FIRST in alternation to match multi-digit with spaces
+# Only whitespace allowed between time and day number (not arbitrary text)
+# l?.rdag / s.ndag tolerate OCR misreads of ø (lørdag, søndag)
+_SCHEDULE_RE = re.compile(
+    r'(?P<month>januar|februar|mars|april|mai|juni|juli|august|september|oktober|november|desember)'
+    r' (?P<year>\d{4})'
+    r'|(?:mandag|tirsdag|onsdag|torsdag|fredag|l?.rdag|s.ndag)'
+    r'\s+(?P<start_hour>\d{1,2}):(?P<start_min>\d{2})\s*-\s*(?P<end_hour>\d{1,2}):(?P<end_min>\d{2})'
+    r'\s{0,20}(?P<day>\d\s+\d|\d{1,2})'
+)
+
+# Shift type by start hour, 00-23 (the SHIFT_TYPES ranges, precomputed)
+_SHIFT_TYPE_BY_HOUR = (
+    ('natt',) * 6 + ('tidlig',) * 6 + ('mellom',) * 4 + ('kveld',) * 6 + ('natt',) * 2
+)
+
+
+def _shift_type_for_hours(start_hour: int, end_hour: int) -> str:
+    """Shift type for a start hour (0-23) and end hour."""
+    # Night shift detection (crosses midnight): a late-evening start that
+    # ends in the morning; other night-window hours are 'natt' in the table
+    if 20 <= start_hour < 22 and end_hour <= 10:
+        return 'natt'
+    return _SHIFT_TYPE_BY_HOUR[start_hour]
+
 
 class VaktplanProcessor:
     """Main processor for shift schedule OCR."""
@@ -124,37 +155,35 @@ class VaktplanProcessor:
     @staticmethod
     def _otsu_threshold(image: Image.Image) -> int:
         """Calculate optimal binarization threshold using Otsu's method."""
+        # Histogram is computed in C straight from the 8-bit buffer; other
+        # modes would yield one 256-bin block per band
+        if image.mode != 'L':
+            image = image.convert('L')
         histogram = image.histogram()
-        total = sum(histogram)
-        weight_sum = sum(i * histogram[i] for i in range(256))
 
-        cum_count = 0
-        cum_weight = 0
-        max_variance = 0
-        threshold = 128  # fallback
+        # Cumulative pixel counts and intensity sums up to each bin
+        cum_counts = list(accumulate(histogram))
+        cum_weights = list(accumulate(map(mul, range(256), histogram)))
+        total = cum_counts[-1]
+        weight_sum = cum_weights[-1]
 
-        for i in range(256):
-            cum_count += histogram[i]
-            if cum_count == 0:
-                continue
-            bg = cum_count
-            fg = total - cum_count
-            if fg == 0:
-                break
-            cum_weight += i * histogram[i]
-            mean_bg = cum_weight / bg
-            mean_fg = (weight_sum - cum_weight) / fg
-            variance = bg * fg * (mean_bg - mean_fg) ** 2
-            if variance > max_variance:
-                max_variance = variance
-                threshold = i
-
-        return threshold
+        # Between-class variance for every split with pixels on both sides
+        variances = [
+            bg * (total - bg) * (cum_weight / bg - (weight_sum - cum_weight) / (total - bg)) ** 2
+            if 0 < bg < total else 0
+            for bg, cum_weight in zip(cum_counts, cum_weights)
+        ]
+
+        max_variance = max(variances)
+        if max_variance <= 0:
+            return 128  # fallback
+        return variances.index(max_variance)
     
     def _extract_shifts(self, ocr_text: str, debug: bool = False) -> List[Shift]:
         """
         Extract shift information from OCR text.
         Supports multiple months in the same image (e.g., November + December).
+        Each shift belongs to the closest month header above it.
         
         Args:
             ocr_text: Raw OCR output text
@@ -163,135 +192,96 @@ class VaktplanProcessor:
         Returns:
             List of Shift objects
         """
-        text_lower = ocr_text.lower()
-        
-        # Find ALL month/year occurrences with their positions
-        month_year_pattern = r'(januar|februar|mars|april|mai|juni|juli|august|september|oktober|november|desember) (\d{4})'
-        month_year_matches = list(re.finditer(month_year_pattern, text_lower))
-        
-        if not month_year_matches:
-            if debug:
-                logger.debug("No month/year found in OCR text")
-            return []
-        
-        # Build month sections: each section has a month, year, start pos, end pos
-        sections = []
-        for i, match in enumerate(month_year_matches):
-            month_name, year = match.groups()
-            month_num = self.MONTH_NAMES.get(month_name)
-            
-            if not month_num:
-                if debug:
-                    logger.debug("Unknown month: %s", month_name)
+        shifts: List[Shift] = []
+        seen_shifts: Set[Tuple[str, str, str]] = set()  # (date, start, end) of kept shifts
+
+        # Month, year and name of the latest header; shifts seen before
+        # the first header are held back and assigned to it
+        section = None
+        orphans: List[re.Match[str]] = []
+
+        for match in _SCHEDULE_RE.finditer(ocr_text.lower()):
+            month_name = match.group('month')
+            if month_name is None:
+                if section is None:
+                    orphans.append(match)
+                else:
+                    self._add_shift(match, section, shifts, seen_shifts, debug)
                 continue
-            
-            start_pos = match.end()  # Start looking for shifts after month header
-            
-            # End position is start of next month, or end of text
-            if i + 1 < len(month_year_matches):
-                end_pos = month_year_matches[i + 1].start()
-            else:
-                end_pos = len(text_lower)
-            
-            sections.append({
-                'month': month_num,
-                'year': year,
-                'start_pos': start_pos,
-                'end_pos': end_pos,
-                'month_name': month_name
-            })
-            
+
+            section = (self.MONTH_NAMES[month_name], match.group('year'), month_name)
             if debug:
-                logger.debug("Found month section: %s %s (pos %d-%d)", month_name, year, start_pos, end_pos)
-        
-        # Find shift lines with pattern: weekday HH:MM - HH:MM \n day
-        # Handles space in day numbers (e.g., "2 3" -> 23)
-        # \d\s+\d must come FIRST in alternation to match multi-digit with spaces
-        # Only whitespace allowed between time and day number (not arbitrary text)
-        shift_pattern = r'(?:mandag|tirsdag|onsdag|torsdag|fredag|l.rdag|.rdag|søndag|s.ndag)\s+(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s{0,20}(\d\s+\d|\d{1,2})'
-        shift_matches = re.finditer(shift_pattern, text_lower)
-
-        shifts = []
-        seen_shifts = set()  # Avoid duplicates
-
-        for match in shift_matches:
-            start_hour, start_min, end_hour, end_min, day = match.groups()
-            match_pos = match.start()
-
-            # Validate time values are in valid range
-            try:
-                sh, sm = int(start_hour), int(start_min)
-                eh, em = int(end_hour), int(end_min)
-                if not (0 <= sh <= 23 and 0 <= sm <= 59 and 0 <= eh <= 23 and 0 <= em <= 59):
-                    if debug:
-                        logger.debug("Invalid time: %s:%s - %s:%s", start_hour, start_min, end_hour, end_min)
-                    continue
-            except ValueError:
-                continue
-            
-            # Find which month section this shift belongs to
-            current_month = None
-            current_year = None
-            current_month_name = None
-            
-            for section in sections:
-                if section['start_pos'] <= match_pos < section['end_pos']:
-                    current_month = section['month']
-                    current_year = section['year']
-                    current_month_name = section['month_name']
-                    break
-            
-            if not current_month:
-                # Default to first section if not found
-                current_month = sections[0]['month']
-                current_year = sections[0]['year']
-                current_month_name = sections[0]['month_name']
-            
-            # Clean day number (remove spaces)
-            day = day.replace(' ', '')
-            
-            try:
-                day_int = int(day)
-                if not (1 <= day_int <= 31):
-                    if debug:
-                        logger.debug("Invalid day: %s", day)
-                    continue
-            except ValueError:
+                logger.debug("Found month section: %s %s (pos %d)", month_name, section[1], match.end())
+
+            for orphan in orphans:
+                self._add_shift(orphan, section, shifts, seen_shifts, debug)
+            orphans.clear()
+
+        if section is None and debug:
+            logger.debug("No month/year found in OCR text")
+
+        return shifts
+
+    def _add_shift(self, match: re.Match, section: tuple, shifts: List[Shift],
+                   seen_shifts: Set[Tuple[str, str, str]], debug: bool) -> None:
+        """Validate a matched shift line and append it to shifts unless it is a duplicate."""
+        start_hour, start_min, end_hour, end_min, day = match.group(
+            'start_hour', 'start_min', 'end_hour', 'end_min', 'day'
+        )
+        current_month, current_year, current_month_name = section
+
+        # Validate time values are in valid range
+        try:
+            sh, sm = int(start_hour), int(start_min)
+            eh, em = int(end_hour), int(end_min)
+            if not (0 <= sh <= 23 and 0 <= sm <= 59 and 0 <= eh <= 23 and 0 <= em <= 59):
                 if debug:
-                    logger.debug("Could not parse day: %s", day)
-                continue
-            
-            # Format date and times
-            date = f"{day.zfill(2)}.{str(current_month).zfill(2)}.{current_year}"
-            start_time = f"{start_hour.zfill(2)}:{start_min}"
-            end_time = f"{end_hour.zfill(2)}:{end_min}"
-            
-            # Avoid duplicates
-            shift_key = f"{date}_{start_time}_{end_time}"
-            if shift_key in seen_shifts:
+                    logger.debug("Invalid time: %s:%s - %s:%s", start_hour, start_min, end_hour, end_min)
+                return
+        except ValueError:
+            return
+
+        # Clean day number (remove spaces)
+        day = day.replace(' ', '')
+
+        try:
+            day_int = int(day)
+            if not (1 <= day_int <= 31):
                 if debug:
-                    logger.debug("Duplicate shift skipped: %s %s-%s", date, start_time, end_time)
-                continue
-            
-            seen_shifts.add(shift_key)
-            
-            # Determine shift type
-            shift_type = self._determine_shift_type(start_time, end_time)
-            
-            shift = Shift(
-                date=date,
-                start_time=start_time,
-                end_time=end_time,
-                shift_type=shift_type,
-                confidence=1.0  # Will be adjusted by confidence scorer
-            )
-            
-            shifts.append(shift)
-            
+                    logger.debug("Invalid day: %s", day)
+                return
+        except ValueError:
             if debug:
-                logger.debug("Found shift in %s: %s %s-%s (%s)", current_month_name, date, start_time, end_time, shift_type)
-        
-        return shifts
+                logger.debug("Could not parse day: %s", day)
+            return
+
+        # Format date and times
+        date = f"{day.zfill(2)}.{str(current_month).zfill(2)}.{current_year}"
+        start_time = f"{start_hour.zfill(2)}:{start_min}"
+        end_time = f"{end_hour.zfill(2)}:{end_min}"
+
+        # Avoid duplicates
+        shift_key = (date, start_time, end_time)
+        if shift_key in seen_shifts:
+            if debug:
+                logger.debug("Duplicate shift skipped: %s %s-%s", date, start_time, end_time)
+            return
+
+        seen_shifts.add(shift_key)
+
+        # Determine shift type from the hours parsed above
+        shift_type = _shift_type_for_hours(sh, eh)
+
+        shifts.append(Shift(
+            date=date,
+            start_time=start_time,
+            end_time=end_time,
+            shift_type=shift_type,
+            confidence=1.0  # Will be adjusted by confidence scorer
+        ))
+
+        if debug:
+            logger.debug("Found shift in %s: %s %s-%s (%s)", current_month_name, date, start_time, end_time, shift_type)
     
     def _determine_shift_type(self, start_time: str, end_time: str) -> str:
         """
@@ -304,23 +294,7 @@ class VaktplanProcessor:
         Returns:
             Shift type: 'tidlig', 'mellom', 'kveld', or 'natt'
         """
-        start_hour = int(start_time.split(':')[0])
-        end_hour = int(end_time.split(':')[0])
-        
-        # Night shift detection (crosses midnight)
-        if start_hour >= 20 or start_hour < 6:
-            if end_hour <= 10:
-                return 'natt'
-        
-        # Standard classification
-        if 6 <= start_hour < 12:
-            return 'tidlig'
-        elif 12 <= start_hour < 16:
-            return 'mellom'
-        elif 16 <= start_hour < 22:
-            return 'kveld'
-        else:
-            return 'natt'
+        return _shift_type_for_hours(int(start_time.split(':')[0]), int(end_time.split(':')[0]))
     
     def generate_ics(self, shifts: List[Shift], owner_name: str) -> bytes:
         """Delegate to calendar_generator module (single source of truth)."""
@@ -5,11 +5,14 @@ Uses OpenAI's multimodal capabilities for superior accuracy.
 import base64
 import io
 import logging
-from typing import List, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Optional, Tuple
 from pathlib import Path
 import json
 
 from openai import OpenAI, RateLimitError, APITimeoutError, APIConnectionError
+from openai.types.chat import ChatCompletionContentPartParam
 from pydantic import ValidationError
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
@@ -21,13 +24,20 @@ from app.config import settings
 logger = logging.getLogger('shiftsync')
 
 
-SUPPORTED_MIME_TYPES = {
+SUPPORTED_MIME_TYPES = MappingProxyType({
     '.jpg': 'image/jpeg',
     '.jpeg': 'image/jpeg',
     '.png': 'image/png',
     '.gif': 'image/gif',
     '.webp': 'image/webp',
-}
+})
+
+
+@lru_cache(maxsize=256)
+def _mime_for(suffix: str) -> str:
+    """MIME type for a file suffix in any case; unknown suffixes are sent as JPEG."""
+    return SUPPORTED_MIME_TYPES.get(suffix.lower(), 'image/jpeg')
+
 
 SYSTEM_MESSAGE = (
     "Du er en presis OCR-assistent spesialisert på norske vaktplaner. "
@@ -81,6 +91,11 @@ Viktig:
 - Tidsformat ALLTID HH:MM (null-padded, 24-timers)
 - Returner BARE JSON, ingen markdown eller forklaring"""
 
+MULTI_IMAGE_NOTE = (
+    "Bildene er sider av samme vaktplan. Ekstraher vakter fra ALLE bildene "
+    "og returner dem samlet i én shifts-liste."
+)
+
 
 class VisionProcessor:
     """Process shift schedule images using GPT-4 Vision."""
@@ -115,15 +130,32 @@ class VisionProcessor:
         Returns:
             Tuple of (list of shifts, overall confidence score)
         """
-        # Encode image (with compression if needed)
-        image_data, mime_type = self._encode_image(image_path)
+        return self.process_images([image_path], debug)
+
+    def process_images(self, image_paths: List[str], debug: bool = False) -> Tuple[List[Shift], float]:
+        """
+        Process several images of one schedule (e.g. pages) in a single Vision API call.
+
+        Args:
+            image_paths: Paths to image files, in page order
+            debug: Enable debug output
+
+        Returns:
+            Tuple of (list of shifts from all images, overall confidence score)
+        """
+        if not image_paths:
+            raise ValueError("At least one image is required for Vision processing")
+
+        # Encode images (with compression if needed)
+        images = [self._encode_image(image_path) for image_path in image_paths]
 
         if debug:
-            logger.debug("Image encoded: %d bytes base64, MIME: %s", len(image_data), mime_type)
+            for image_data, mime_type in images:
+                logger.debug("Image encoded: %d bytes base64, MIME: %s", len(image_data), mime_type)
 
         try:
             # Call Vision API with retry logic
-            data = self._call_vision_api(image_data, mime_type, debug)
+            data = self._call_vision_api(images, debug)
 
             # Parse shifts from response
             shifts_data = data.get("shifts", [])
@@ -191,28 +223,29 @@ class VisionProcessor:
         ),
         reraise=True,
     )
-    def _call_vision_api(self, image_data: str, mime_type: str, debug: bool) -> dict:
+    def _call_vision_api(self, images: List[Tuple[str, str]], debug: bool) -> dict:
         """Call Vision API with retry logic for transient failures."""
         if debug:
-            logger.debug("Calling Vision API (model: %s)...", settings.openai_model)
+            logger.debug("Calling Vision API (model: %s, %d image(s))...", settings.openai_model, len(images))
+
+        prompt = USER_PROMPT if len(images) == 1 else f"{USER_PROMPT}\n\n{MULTI_IMAGE_NOTE}"
+        user_content: List[ChatCompletionContentPartParam] = [{"type": "text", "text": prompt}]
+        user_content.extend(
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:{mime_type};base64,{image_data}",
+                    "detail": "high",
+                },
+            }
+            for image_data, mime_type in images
+        )
 
         response = self.client.chat.completions.create(
             model=settings.openai_model,
             messages=[
                 {"role": "system", "content": SYSTEM_MESSAGE},
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": USER_PROMPT},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:{mime_type};base64,{image_data}",
-                                "detail": "high",
-                            },
-                        },
-                    ],
-                },
+                {"role": "user", "content": user_content},
             ],
             max_tokens=4000,
             temperature=0.1,
@@ -254,8 +287,7 @@ class VisionProcessor:
             Tuple of (base64_data, mime_type)
         """
         path = Path(image_path)
-        file_ext = path.suffix.lower()
-        mime_type = SUPPORTED_MIME_TYPES.get(file_ext, 'image/jpeg')
+        mime_type = _mime_for(path.suffix)
 
         file_size = path.stat().st_size
 
@@ -270,8 +302,36 @@ class VisionProcessor:
 
             buffer = io.BytesIO()
             image.save(buffer, format='JPEG', quality=85, optimize=True)
-            buffer.seek(0)
-            return base64.b64encode(buffer.read()).decode('utf-8'), 'image/jpeg'
+            # Encode straight from the buffer's memory instead of copying it out with read()
+            with buffer.getbuffer() as view:
+                return base64.b64encode(view).decode('ascii'), 'image/jpeg'
 
         with open(image_path, "rb") as f:
-            return base64.b64encode(f.read()).decode('utf-8'), mime_type
+            return base64.b64encode(f.read()).decode('ascii'), mime_type
+
+
+# Shared processor and the API key it was built with (see get_vision_processor)
+_vision_instance: Optional[Tuple[str, VisionProcessor]] = None
+
+
+def get_vision_processor(api_key: str) -> VisionProcessor:
+    """
+    Get the shared VisionProcessor for an API key (singleton).
+
+    Reusing the instance keeps the httpx connection pool to OpenAI alive, so
+    only the first request pays the TLS handshake. A different key replaces
+    the instance and closes the old client.
+    """
+    global _vision_instance
+    if _vision_instance is None or _vision_instance[0] != api_key:
+        close_vision_processor()
+        _vision_instance = (api_key, VisionProcessor(api_key=api_key))
+    return _vision_instance[1]
+
+
+def close_vision_processor() -> None:
+    """Close and forget the shared VisionProcessor, if one was created."""
+    global _vision_instance
+    if _vision_instance is not None:
+        _vision_instance[1].close()
+        _vision_instance = None
@@ -5,12 +5,13 @@ import hashlib
 import hmac
 import logging
 import time
+from functools import lru_cache
 
 import magic
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from fastapi import Request, HTTPException, UploadFile
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 from app.config import settings
 
 logger = logging.getLogger('shiftsync')
@@ -53,6 +54,19 @@ def get_user_identifier(request: Request) -> str:
 DOWNLOAD_TOKEN_EXPIRY = 600
 
 
+@lru_cache(maxsize=1)
+def _hmac_prototype(salt: str) -> hmac.HMAC:
+    """Keyed HMAC-SHA256 state for the salt; never updated, only copied."""
+    return hmac.new(salt.encode(), digestmod=hashlib.sha256)
+
+
+def _sign(message: bytes) -> str:
+    """HMAC-SHA256 hex signature of message with SECRET_SALT (key setup is reused)."""
+    mac = _hmac_prototype(settings.secret_salt).copy()
+    mac.update(message)
+    return mac.hexdigest()
+
+
 def generate_download_token(upload_id: str, session_id: str) -> str:
     """
     Generate HMAC-signed download token for a specific upload bound to a session.
@@ -67,10 +81,7 @@ def generate_download_token(upload_id: str, session_id: str) -> str:
     """
     expiry = int(time.time()) + DOWNLOAD_TOKEN_EXPIRY
     message = f"{upload_id}:{session_id}:{expiry}".encode()
-    signature = hmac.new(
-        settings.secret_salt.encode(), message, hashlib.sha256
-    ).hexdigest()
-    return f"{expiry}:{signature}"
+    return f"{expiry}:{_sign(message)}"
 
 
 def validate_download_token(upload_id: str, token: str, session_id: str) -> None:
@@ -97,14 +108,27 @@ def validate_download_token(upload_id: str, token: str, session_id: str) -> None
 
     # Verify signature (bound to session)
     message = f"{upload_id}:{session_id}:{expiry}".encode()
-    expected = hmac.new(
-        settings.secret_salt.encode(), message, hashlib.sha256
-    ).hexdigest()
-
-    if not hmac.compare_digest(signature, expected):
+    if not hmac.compare_digest(signature, _sign(message)):
         raise HTTPException(status_code=403, detail="Invalid download token")
 
 
+# Allowance for multipart boundaries and part headers on top of the file itself
+UPLOAD_BODY_OVERHEAD_BYTES = 64 * 1024
+
+
+def upload_exceeds_size_limit(content_length: Optional[str]) -> bool:
+    """
+    Preflight size check from the Content-Length header.
+    Lets oversized uploads be rejected before the multipart body is read.
+    Missing or malformed headers pass through to validate_file().
+    """
+    # ASCII only: str.isdigit() also accepts digits like "²" that int() rejects
+    if not content_length or not (content_length.isascii() and content_length.isdigit()):
+        return False
+    max_body = settings.max_file_size_mb * 1024 * 1024 + UPLOAD_BODY_OVERHEAD_BYTES
+    return int(content_length) > max_body
+
+
 async def validate_file(file: UploadFile) -> bytes:
     """
     Validate uploaded file and return its content.
@@ -159,6 +183,14 @@ async def validate_file(file: UploadFile) -> bytes:
     return content
 
 
+# Known file signatures: the first 4 bytes of each allowed type
+_FILE_SIGNATURES = {
+    'image/jpeg': frozenset({b'\xff\xd8\xff\xe0', b'\xff\xd8\xff\xe1', b'\xff\xd8\xff\xe2', b'\xff\xd8\xff\xe3'}),
+    'image/png': frozenset({b'\x89PNG'}),
+    'application/pdf': frozenset({b'%PDF'}),
+}
+
+
 def validate_file_signature(content: bytes, mime_type: str) -> bool:
     """
     Validate file signature against known magic bytes.
@@ -166,19 +198,8 @@ def validate_file_signature(content: bytes, mime_type: str) -> bool:
     """
     if len(content) < 4:
         return False
-    
-    # Get first 4 bytes as hex
-    header = content[:4].hex()
-    
-    # Known file signatures
-    signatures = {
-        'image/jpeg': ['ffd8ffe0', 'ffd8ffe1', 'ffd8ffe2', 'ffd8ffe3'],
-        'image/png': ['89504e47'],
-        'application/pdf': ['25504446']
-    }
-    
-    expected_sigs = signatures.get(mime_type, [])
-    return any(header.startswith(sig) for sig in expected_sigs)
+
+    return content[:4] in _FILE_SIGNATURES.get(mime_type, ())
 
 
 async def scan_file_for_malware(file_path: str) -> bool:
@@ -193,6 +214,17 @@ async def scan_file_for_malware(file_path: str) -> bool:
     return True
 
 
+MalwareScanner = Callable[[str], Awaitable[bool]]
+
+
+def get_malware_scanner() -> MalwareScanner:
+    """
+    FastAPI dependency providing the malware scanner.
+    Lets tests swap the scanner via app.dependency_overrides.
+    """
+    return scan_file_for_malware
+
+
 def get_country_code(request: Request) -> Optional[str]:
     """
     Extract country code from request for analytics.
@@ -19,6 +19,10 @@ from fastapi.testclient import TestClient
 from app.models import Shift
 
 
+async def _skip_malware_scan(file_path: str) -> bool:
+    return True
+
+
 @pytest.fixture
 def test_settings():
     """Mock settings for testing."""
@@ -40,14 +44,32 @@ def test_settings():
         yield mock_settings
 
 
-@pytest.fixture
-def client(test_settings):
-    """Create test client with mocked dependencies."""
-    from app.main import app, _session_creation_times
-    # Clear session rate limiter between tests to prevent 429s
-    _session_creation_times.clear()
+@pytest.fixture(scope="session")
+def _app_client():
+    """
+    One TestClient per test session, so app startup runs once instead of per test.
+    The lifespan is kept: its startup phase creates the database schema.
+    """
+    from app.main import app
+    from app.security import get_malware_scanner
+    # Malware scanning is a no-op placeholder; bypass it without patching
+    app.dependency_overrides[get_malware_scanner] = lambda: _skip_malware_scan
     with TestClient(app) as test_client:
         yield test_client
+    app.dependency_overrides.pop(get_malware_scanner, None)
+
+
+@pytest.fixture
+def client(test_settings, _app_client):
+    """Test client with per-test state reset (session cookie and rate limiters)."""
+    from app.main import _session_creation_times
+    from app.security import limiter
+    # Clear session and endpoint rate limiters between tests to prevent 429s
+    # (tests from different files may share a process under pytest-xdist)
+    _session_creation_times.clear()
+    limiter.reset()
+    _app_client.cookies.clear()
+    return _app_client
 
 
 @pytest.fixture
@@ -56,9 +78,7 @@ def api_key_header():
     return {"X-API-Key": "test_api_key_12345"}
 
 
-@pytest.fixture
-def sample_shifts():
-    """Sample shifts for testing (tidlig, kveld, natt)."""
+def _build_sample_shifts():
     return [
         Shift(
             date="15.01.2025",
@@ -82,3 +102,23 @@ def sample_shifts():
             confidence=0.90,
         ),
     ]
+
+
+@pytest.fixture
+def sample_shifts():
+    """Sample shifts for testing (tidlig, kveld, natt)."""
+    return _build_sample_shifts()
+
+
+@pytest.fixture(scope="session")
+def parsed_sample_ics():
+    """The sample shifts rendered to ICS for "Test User", parsed once per session (read-only)."""
+    from icalendar import Calendar
+    from app.ocr.calendar_generator import generate_ics
+    return Calendar.from_ical(generate_ics(_build_sample_shifts(), "Test User"))
+
+
+@pytest.fixture
+def sample_shifts_json(sample_shifts):
+    """sample_shifts serialized once for JSON request bodies."""
+    return [s.model_dump(mode="json") for s in sample_shifts]
@@ -0,0 +1,17 @@
+"""
+Plain test helpers shared by several test modules.
+"""
+from types import MappingProxyType
+
+
+# Frozen stand-in for PaymentService.CREDIT_PACKS, shared by the endpoint tests
+CREDIT_PACKS = MappingProxyType({
+    "pack_5": MappingProxyType({"credits": 5, "price_nok": 39_00, "name": "5-pack", "price_per_credit": 7_80}),
+})
+
+
+def async_return(value):
+    """Plain coroutine stub for async methods whose calls aren't asserted on."""
+    async def _stub(*args, **kwargs):
+        return value
+    return _stub
@@ -2,7 +2,12 @@
 Tests for download/calendar generation API endpoints.
 """
 import pytest
-from unittest.mock import patch
+
+
+# Download token for ("test-upload-456", "session-A") signed with _TOKEN_SALT.
+# Expiry is 2100-01-01 so the token is never rejected as expired.
+_TOKEN_SALT = "test_salt_for_testing_minimum_32chars!"
+_SESSION_A_TOKEN = "4102444800:cb02e90e300cd308c59260527115691c499224bc9b41f83f256b2bf3419cb8a4"
 
 
 class TestGenerateCalendar:
@@ -24,10 +29,9 @@ class TestGenerateCalendar:
 
         assert response.status_code == 200
         assert "text/calendar" in response.headers.get("content-type", "")
-        content = response.content.decode("utf-8")
-        assert "BEGIN:VCALENDAR" in content
-        assert "BEGIN:VEVENT" in content
-        assert "Test User" in content
+        assert b"BEGIN:VCALENDAR" in response.content
+        assert b"BEGIN:VEVENT" in response.content
+        assert b"Test User" in response.content
 
     def test_empty_shifts_rejected(self, client):
         response = client.post("/api/generate-calendar", json={
@@ -55,16 +59,14 @@ class TestGenerateCalendar:
             content = response.content.decode("utf-8")
             assert "<script>" not in content
 
-    def test_multiple_shifts_in_output(self, client, sample_shifts):
-        shifts_data = [s.model_dump() for s in sample_shifts]
+    def test_multiple_shifts_in_output(self, client, sample_shifts_json):
         response = client.post("/api/generate-calendar", json={
-            "shifts": shifts_data,
+            "shifts": sample_shifts_json,
             "owner_name": "Ola",
         })
 
         assert response.status_code == 200
-        content = response.content.decode("utf-8")
-        assert content.count("BEGIN:VEVENT") == 3
+        assert response.content.count(b"BEGIN:VEVENT") == 3
 
     def test_content_disposition_header(self, client):
         response = client.post("/api/generate-calendar", json={
@@ -104,19 +106,18 @@ class TestDownloadToken:
         )
         assert response.status_code == 403
 
-    def test_token_from_different_session_rejected(self, client):
+    def test_token_from_different_session_rejected(self, client, monkeypatch):
         """A token generated for one session should not work with a different session."""
-        from app.security import generate_download_token
+        from app.security import validate_download_token
 
-        with patch('app.security.settings') as mock_settings:
-            mock_settings.secret_salt = "test_salt_for_testing_minimum_32chars!"
-            # Generate token for session-A
-            token = generate_download_token("test-upload-456", "session-A")
+        monkeypatch.setattr("app.security.settings.secret_salt", _TOKEN_SALT)
+        # Guard: the literal must be valid for session-A, or this test proves nothing
+        validate_download_token("test-upload-456", _SESSION_A_TOKEN, "session-A")
 
         # Client will have its own session_id (not "session-A"),
         # so validation should fail
         response = client.get(
             "/api/download/test-upload-456",
-            params={"token": token},
+            params={"token": _SESSION_A_TOKEN},
         )
         assert response.status_code == 403
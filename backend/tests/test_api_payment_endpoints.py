@@ -2,18 +2,52 @@
 Tests for payment API endpoints.
 """
 import pytest
-from unittest.mock import patch, AsyncMock, MagicMock
-
 import stripe
+from unittest.mock import patch, AsyncMock, MagicMock, DEFAULT
+
+from tests.helpers import CREDIT_PACKS, async_return
+
+
+@pytest.fixture(autouse=True)
+def _stub_webhook_secret(monkeypatch):
+    """Configure a webhook secret so the endpoint reaches signature verification."""
+    monkeypatch.setattr("app.api.payment.settings.stripe_webhook_secret", "whsec_test123")
+
+
+@pytest.fixture
+def construct_event(monkeypatch):
+    """Stand-in for stripe.Webhook.construct_event; tests set return_value/side_effect."""
+    mock = MagicMock()
+    monkeypatch.setattr("app.api.payment.stripe.Webhook.construct_event", mock)
+    return mock
+
+
+@pytest.fixture
+def webhook_db():
+    """Patch the idempotency and credit helpers in app.database in one go."""
+    with patch.multiple(
+        "app.database",
+        new_callable=AsyncMock,
+        is_webhook_processed=DEFAULT,
+        mark_webhook_processed=DEFAULT,
+        add_credits=DEFAULT,
+    ) as mocks:
+        mocks["is_webhook_processed"].return_value = False
+        yield mocks
+
+
+@pytest.fixture(autouse=True)
+def _stub_stripe_checkout(monkeypatch):
+    """Keep checkout tests off the network even if a real Stripe key is configured."""
+    create = MagicMock(return_value=MagicMock(url="https://checkout.stripe.com/test"))
+    monkeypatch.setattr("app.payment.stripe.checkout.Session.create", create)
+    return create
 
 
 class TestWebhookEndpoint:
     """Tests for POST /api/payment/webhook."""
 
-    @patch('app.api.payment.settings')
-    def test_webhook_missing_signature(self, mock_settings, client):
-        mock_settings.stripe_webhook_secret = "whsec_test123"
-
+    def test_webhook_missing_signature(self, client):
         response = client.post(
             "/api/payment/webhook",
             content=b'{"type": "test"}',
@@ -21,11 +55,8 @@ class TestWebhookEndpoint:
         )
         assert response.status_code == 400
 
-    @patch('app.api.payment.stripe.Webhook.construct_event',
-           side_effect=stripe.error.SignatureVerificationError("bad sig", "header"))
-    @patch('app.api.payment.settings')
-    def test_webhook_invalid_signature(self, mock_settings, mock_construct, client):
-        mock_settings.stripe_webhook_secret = "whsec_test123"
+    def test_webhook_invalid_signature(self, construct_event, client):
+        construct_event.side_effect = stripe.SignatureVerificationError("bad sig", "header")
 
         response = client.post(
             "/api/payment/webhook",
@@ -41,11 +72,8 @@ class TestWebhookEndpoint:
 class TestWebhookIdempotency:
     """Tests for webhook idempotency (H-03)."""
 
-    @patch('app.api.payment.stripe.Webhook.construct_event')
-    @patch('app.api.payment.settings')
-    def test_duplicate_event_skipped(self, mock_settings, mock_construct, client):
-        mock_settings.stripe_webhook_secret = "whsec_test123"
-        mock_construct.return_value = {
+    def test_duplicate_event_skipped(self, construct_event, webhook_db, client):
+        construct_event.return_value = {
             "id": "evt_test_duplicate",
             "type": "checkout.session.completed",
             "data": {"object": {
@@ -54,45 +82,40 @@ class TestWebhookIdempotency:
                 "metadata": {"pack_id": "pack_5"},
             }},
         }
+        mock_check = webhook_db["is_webhook_processed"]
+        mock_mark = webhook_db["mark_webhook_processed"]
 
-        with patch('app.database.is_webhook_processed', new_callable=AsyncMock) as mock_check, \
-             patch('app.database.mark_webhook_processed', new_callable=AsyncMock) as mock_mark, \
-             patch('app.database.add_credits', new_callable=AsyncMock):
-
-            # First call: not processed yet
-            mock_check.return_value = False
-            response = client.post(
-                "/api/payment/webhook",
-                content=b'{}',
-                headers={"stripe-signature": "t=123,v1=valid"},
-            )
-            assert response.status_code == 200
-            assert response.json()["status"] == "success"
-            mock_mark.assert_called_once()
-
-            mock_mark.reset_mock()
-
-            # Second call: already processed
-            mock_check.return_value = True
-            response = client.post(
-                "/api/payment/webhook",
-                content=b'{}',
-                headers={"stripe-signature": "t=123,v1=valid"},
-            )
-            assert response.status_code == 200
-            assert response.json()["status"] == "already_processed"
-            mock_mark.assert_not_called()
+        # First call: not processed yet
+        mock_check.return_value = False
+        response = client.post(
+            "/api/payment/webhook",
+            content=b'{}',
+            headers={"stripe-signature": "t=123,v1=valid"},
+        )
+        assert response.status_code == 200
+        assert response.json()["status"] == "success"
+        mock_mark.assert_called_once()
+
+        mock_mark.reset_mock()
+
+        # Second call: already processed
+        mock_check.return_value = True
+        response = client.post(
+            "/api/payment/webhook",
+            content=b'{}',
+            headers={"stripe-signature": "t=123,v1=valid"},
+        )
+        assert response.status_code == 200
+        assert response.json()["status"] == "already_processed"
+        mock_mark.assert_not_called()
 
 
 class TestWebhookCreditTampering:
     """Tests for webhook metadata tampering prevention (C-02)."""
 
-    @patch('app.api.payment.stripe.Webhook.construct_event')
-    @patch('app.api.payment.settings')
-    def test_credits_from_packs_not_metadata(self, mock_settings, mock_construct, client):
+    def test_credits_from_packs_not_metadata(self, construct_event, webhook_db, client):
         """Tampered metadata credits=9999 should be ignored; pack_5 gives exactly 5."""
-        mock_settings.stripe_webhook_secret = "whsec_test123"
-        mock_construct.return_value = {
+        construct_event.return_value = {
             "id": "evt_test_tamper",
             "type": "checkout.session.completed",
             "data": {"object": {
@@ -105,24 +128,18 @@ class TestWebhookCreditTampering:
             }},
         }
 
-        with patch('app.database.is_webhook_processed', new_callable=AsyncMock, return_value=False), \
-             patch('app.database.mark_webhook_processed', new_callable=AsyncMock), \
-             patch('app.database.add_credits', new_callable=AsyncMock) as mock_add:
-            response = client.post(
-                "/api/payment/webhook",
-                content=b'{}',
-                headers={"stripe-signature": "t=123,v1=valid"},
-            )
-            assert response.status_code == 200
-            # Should add exactly 5 credits (from CREDIT_PACKS), not 9999
-            mock_add.assert_called_once_with("session-tamper", 5)
-
-    @patch('app.api.payment.stripe.Webhook.construct_event')
-    @patch('app.api.payment.settings')
-    def test_unpaid_checkout_rejected(self, mock_settings, mock_construct, client):
+        response = client.post(
+            "/api/payment/webhook",
+            content=b'{}',
+            headers={"stripe-signature": "t=123,v1=valid"},
+        )
+        assert response.status_code == 200
+        # Should add exactly 5 credits (from CREDIT_PACKS), not 9999
+        webhook_db["add_credits"].assert_called_once_with("session-tamper", 5)
+
+    def test_unpaid_checkout_rejected(self, construct_event, webhook_db, client):
         """Checkout with payment_status != 'paid' should be skipped."""
-        mock_settings.stripe_webhook_secret = "whsec_test123"
-        mock_construct.return_value = {
+        construct_event.return_value = {
             "id": "evt_test_unpaid",
             "type": "checkout.session.completed",
             "data": {"object": {
@@ -132,16 +149,13 @@ class TestWebhookCreditTampering:
             }},
         }
 
-        with patch('app.database.is_webhook_processed', new_callable=AsyncMock, return_value=False), \
-             patch('app.database.mark_webhook_processed', new_callable=AsyncMock), \
-             patch('app.database.add_credits', new_callable=AsyncMock) as mock_add:
-            response = client.post(
-                "/api/payment/webhook",
-                content=b'{}',
-                headers={"stripe-signature": "t=123,v1=valid"},
-            )
-            assert response.status_code == 200
-            mock_add.assert_not_called()
+        response = client.post(
+            "/api/payment/webhook",
+            content=b'{}',
+            headers={"stripe-signature": "t=123,v1=valid"},
+        )
+        assert response.status_code == 200
+        webhook_db["add_credits"].assert_not_called()
 
 
 class TestCreditStatus:
@@ -149,11 +163,9 @@ class TestCreditStatus:
 
     @patch('app.api.payment.payment_service')
     def test_credit_status_free(self, mock_service, client):
-        mock_service.check_quota = AsyncMock(return_value=(True, 2, 0))
+        mock_service.check_quota = async_return((True, 2, 0))
         mock_service.FREE_TIER_LIMIT = 2
-        mock_service.CREDIT_PACKS = {
-            "pack_5": {"credits": 5, "price_nok": 39_00, "name": "5-pack", "price_per_credit": 7_80},
-        }
+        mock_service.CREDIT_PACKS = CREDIT_PACKS
 
         response = client.get("/api/payment/credit-status")
         assert response.status_code == 200
@@ -166,7 +178,7 @@ class TestCreditStatus:
 
     @patch('app.api.payment.payment_service')
     def test_credit_status_premium(self, mock_service, client):
-        mock_service.check_quota = AsyncMock(return_value=(True, -1, 0))
+        mock_service.check_quota = async_return((True, -1, 0))
         mock_service.FREE_TIER_LIMIT = 2
         mock_service.CREDIT_PACKS = {}
 
@@ -178,7 +190,7 @@ class TestCreditStatus:
 
     @patch('app.api.payment.payment_service')
     def test_credit_status_with_credits(self, mock_service, client):
-        mock_service.check_quota = AsyncMock(return_value=(True, 0, 10))
+        mock_service.check_quota = async_return((True, 0, 10))
         mock_service.FREE_TIER_LIMIT = 2
         mock_service.CREDIT_PACKS = {}
 
@@ -200,21 +212,15 @@ class TestCheckoutEndpoint:
         })
         assert response.status_code == 422  # Pydantic validation
 
-    def test_accepts_allowed_host(self, client):
+    @pytest.mark.parametrize("url_base", ["https://shiftsync.no", "http://localhost:3000"])
+    def test_accepts_allowed_host(self, client, url_base):
         response = client.post("/api/payment/create-checkout-session", json={
-            "success_url": "https://shiftsync.no/success",
-            "cancel_url": "https://shiftsync.no/cancel",
+            "success_url": f"{url_base}/success",
+            "cancel_url": f"{url_base}/cancel",
         })
         # May fail if Stripe not configured, but should not be 422
         assert response.status_code != 422
 
-    def test_accepts_localhost(self, client):
-        response = client.post("/api/payment/create-checkout-session", json={
-            "success_url": "http://localhost:3000/success",
-            "cancel_url": "http://localhost:3000/cancel",
-        })
-        assert response.status_code != 422
-
 
 class TestCreditCheckoutEndpoint:
     """Tests for POST /api/payment/create-credit-checkout."""
@@ -6,64 +6,81 @@ import io
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 
+from app.security import UPLOAD_BODY_OVERHEAD_BYTES
+from tests.helpers import CREDIT_PACKS, async_return
+
+
+# Shared payloads - built once per module, wrapped in a fresh BytesIO per request
+_JPEG_CONTENT = bytes([0xFF, 0xD8, 0xFF, 0xE0]) + b'\x00' * 100
+
+
+def _encode_multipart(filename: str, content: bytes, content_type: str):
+    """Build a single-file multipart body once, so rejection tests can post it raw."""
+    boundary = "shiftsync-test-boundary"
+    body = (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'
+    ).encode() + content + f'\r\n--{boundary}--\r\n'.encode()
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    return body, headers
+
+
+_EMPTY_BODY, _EMPTY_HEADERS = _encode_multipart("test.jpg", b"", "image/jpeg")
+_TEXT_BODY, _TEXT_HEADERS = _encode_multipart("test.txt", b"hello world text content", "text/plain")
+
 
 class TestUploadEndpoint:
     """Tests for POST /api/upload."""
 
     @patch('app.payment.payment_service')
     def test_rejects_empty_file(self, mock_payment, client):
-        mock_payment.check_quota = AsyncMock(return_value=(True, 2, 0))
+        mock_payment.check_quota = async_return((True, 2, 0))
 
-        response = client.post(
-            "/api/upload",
-            files={"file": ("test.jpg", io.BytesIO(b""), "image/jpeg")},
-        )
+        response = client.post("/api/upload", content=_EMPTY_BODY, headers=_EMPTY_HEADERS)
         assert response.status_code == 400
 
     @patch('app.payment.payment_service')
     def test_rejects_oversized_file(self, mock_payment, client):
-        mock_payment.check_quota = AsyncMock(return_value=(True, 2, 0))
+        mock_payment.check_quota = async_return((True, 2, 0))
 
-        large_content = b"\x00" * (11 * 1024 * 1024)  # 11MB
+        # Rejected on Content-Length alone, so only a tiny body is actually sent
+        oversized = 11 * 1024 * 1024 + UPLOAD_BODY_OVERHEAD_BYTES  # > 10MB limit + overhead
         response = client.post(
             "/api/upload",
-            files={"file": ("large.jpg", io.BytesIO(large_content), "image/jpeg")},
+            content=_EMPTY_BODY,
+            headers={**_EMPTY_HEADERS, "Content-Length": str(oversized)},
         )
         assert response.status_code == 413
 
     @patch('app.payment.payment_service')
     def test_rejects_invalid_mime(self, mock_payment, client):
-        mock_payment.check_quota = AsyncMock(return_value=(True, 2, 0))
+        mock_payment.check_quota = async_return((True, 2, 0))
 
         # Text file content
-        response = client.post(
-            "/api/upload",
-            files={"file": ("test.txt", io.BytesIO(b"hello world text content"), "text/plain")},
-        )
+        response = client.post("/api/upload", content=_TEXT_BODY, headers=_TEXT_HEADERS)
         assert response.status_code == 400
 
     @patch('app.api.upload.log_upload', new_callable=AsyncMock)
-    @patch('app.api.upload.scan_file_for_malware', new_callable=AsyncMock, return_value=True)
     @patch('app.api.upload.storage')
     @patch('app.api.upload.validate_file', new_callable=AsyncMock)
     @patch('app.payment.payment_service')
     def test_successful_upload(
         self, mock_payment, mock_validate, mock_storage,
-        mock_scan, mock_log, client
+        mock_log, client
     ):
         # Setup mocks
-        mock_payment.check_quota = AsyncMock(return_value=(True, 2, 0))
-        mock_validate.return_value = b'\xFF\xD8\xFF\xE0' + b'\x00' * 100
+        mock_payment.check_quota = async_return((True, 2, 0))
+        mock_validate.return_value = _JPEG_CONTENT
 
-        mock_storage.upload_file = AsyncMock(return_value="blob://test")
-        mock_storage.get_file_path = AsyncMock(return_value="/tmp/test.jpg")
+        mock_storage.upload_file = async_return("blob://test")
+        mock_storage.get_file_path = async_return("/tmp/test.jpg")
 
         mock_log.return_value = "test-uuid"
 
-        jpeg_content = bytes([0xFF, 0xD8, 0xFF, 0xE0]) + b'\x00' * 100
         response = client.post(
             "/api/upload",
-            files={"file": ("test.jpg", io.BytesIO(jpeg_content), "image/jpeg")},
+            files={"file": ("test.jpg", io.BytesIO(_JPEG_CONTENT), "image/jpeg")},
         )
 
         assert response.status_code == 200
@@ -73,16 +90,13 @@ class TestUploadEndpoint:
 
     @patch('app.payment.payment_service')
     def test_quota_exceeded_402(self, mock_payment, client):
-        mock_payment.check_quota = AsyncMock(return_value=(False, 0, 0))
+        mock_payment.check_quota = async_return((False, 0, 0))
         mock_payment.FREE_TIER_LIMIT = 2
-        mock_payment.CREDIT_PACKS = {
-            "pack_5": {"credits": 5, "price_nok": 39_00, "name": "5-pack"},
-        }
+        mock_payment.CREDIT_PACKS = CREDIT_PACKS
 
-        jpeg_content = bytes([0xFF, 0xD8, 0xFF, 0xE0]) + b'\x00' * 100
         response = client.post(
             "/api/upload",
-            files={"file": ("test.jpg", io.BytesIO(jpeg_content), "image/jpeg")},
+            files={"file": ("test.jpg", io.BytesIO(_JPEG_CONTENT), "image/jpeg")},
         )
 
         assert response.status_code == 402
@@ -92,25 +106,23 @@ class TestUploadEndpoint:
 
     @patch('app.api.upload.deduct_credit', new_callable=AsyncMock, return_value=True)
     @patch('app.api.upload.log_upload', new_callable=AsyncMock)
-    @patch('app.api.upload.scan_file_for_malware', new_callable=AsyncMock, return_value=True)
     @patch('app.api.upload.storage')
     @patch('app.api.upload.validate_file', new_callable=AsyncMock)
     @patch('app.payment.payment_service')
     def test_upload_deducts_credit_when_free_exhausted(
         self, mock_payment, mock_validate, mock_storage,
-        mock_scan, mock_log, mock_deduct, client
+        mock_log, mock_deduct, client
     ):
         # Free exhausted, but has credits
-        mock_payment.check_quota = AsyncMock(return_value=(True, 0, 5))
-        mock_validate.return_value = b'\xFF\xD8\xFF\xE0' + b'\x00' * 100
-        mock_storage.upload_file = AsyncMock(return_value="blob://test")
-        mock_storage.get_file_path = AsyncMock(return_value="/tmp/test.jpg")
+        mock_payment.check_quota = async_return((True, 0, 5))
+        mock_validate.return_value = _JPEG_CONTENT
+        mock_storage.upload_file = async_return("blob://test")
+        mock_storage.get_file_path = async_return("/tmp/test.jpg")
         mock_log.return_value = "test-uuid"
 
-        jpeg_content = bytes([0xFF, 0xD8, 0xFF, 0xE0]) + b'\x00' * 100
         response = client.post(
             "/api/upload",
-            files={"file": ("test.jpg", io.BytesIO(jpeg_content), "image/jpeg")},
+            files={"file": ("test.jpg", io.BytesIO(_JPEG_CONTENT), "image/jpeg")},
         )
 
         assert response.status_code == 200
@@ -1,7 +1,7 @@
 """
 Tests for calendar_generator.py - pure functions, no mocking needed.
 """
-import re
+import uuid
 
 import pytest
 from icalendar import Calendar
@@ -10,6 +10,11 @@ from app.ocr.calendar_generator import sanitize_calendar_text, generate_ics
 from app.models import Shift
 
 
+def _events(cal):
+    """VEVENTs of a parsed calendar (they are direct children, so no walk() needed)."""
+    return [c for c in cal.subcomponents if c.name == "VEVENT"]
+
+
 class TestSanitizeCalendarText:
     """Tests for sanitize_calendar_text()."""
 
@@ -61,15 +66,11 @@ class TestSanitizeCalendarText:
 class TestGenerateIcs:
     """Tests for generate_ics()."""
 
-    def test_valid_ics_output(self, sample_shifts):
-        ics_bytes = generate_ics(sample_shifts, "Test User")
-        cal = Calendar.from_ical(ics_bytes)
-        assert cal is not None
+    def test_valid_ics_output(self, parsed_sample_ics):
+        assert parsed_sample_ics.name == "VCALENDAR"
 
-    def test_contains_all_shifts(self, sample_shifts):
-        ics_bytes = generate_ics(sample_shifts, "Test User")
-        cal = Calendar.from_ical(ics_bytes)
-        events = [c for c in cal.walk() if c.name == "VEVENT"]
+    def test_contains_all_shifts(self, parsed_sample_ics):
+        events = _events(parsed_sample_ics)
         assert len(events) == 3
 
     def test_correct_event_times(self):
@@ -84,7 +85,7 @@ class TestGenerateIcs:
         ]
         ics_bytes = generate_ics(shifts, "Test")
         cal = Calendar.from_ical(ics_bytes)
-        events = [c for c in cal.walk() if c.name == "VEVENT"]
+        events = _events(cal)
         event = events[0]
 
         dtstart = event.get("dtstart").dt
@@ -108,7 +109,7 @@ class TestGenerateIcs:
         ]
         ics_bytes = generate_ics(shifts, "Test")
         cal = Calendar.from_ical(ics_bytes)
-        events = [c for c in cal.walk() if c.name == "VEVENT"]
+        events = _events(cal)
         event = events[0]
 
         dtstart = event.get("dtstart").dt
@@ -128,7 +129,7 @@ class TestGenerateIcs:
         ]
         ics_bytes = generate_ics(shifts, "Test")
         cal = Calendar.from_ical(ics_bytes)
-        events = [c for c in cal.walk() if c.name == "VEVENT"]
+        events = _events(cal)
         event = events[0]
 
         dtstart = event.get("dtstart").dt
@@ -175,7 +176,7 @@ class TestGenerateIcs:
         ]
         ics_bytes = generate_ics(shifts, "Ola")
         cal = Calendar.from_ical(ics_bytes)
-        events = [c for c in cal.walk() if c.name == "VEVENT"]
+        events = _events(cal)
         summary = str(events[0].get("summary"))
         assert "Ola" in summary
         assert "jobber" in summary
@@ -210,7 +211,7 @@ class TestGenerateIcs:
         ]
         ics_bytes = generate_ics(shifts, "Test")
         cal = Calendar.from_ical(ics_bytes)
-        events = [c for c in cal.walk() if c.name == "VEVENT"]
+        events = _events(cal)
         event = events[0]
 
         dtstart = event.get("dtstart").dt
@@ -233,12 +234,17 @@ class TestGenerateIcs:
         ]
         ics_bytes = generate_ics(shifts, "Test")
         cal = Calendar.from_ical(ics_bytes)
-        events = [c for c in cal.walk() if c.name == "VEVENT"]
+        events = _events(cal)
         uid = str(events[0].get("uid"))
         # UUID4 format: xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx@shiftsync.no
         assert uid.endswith("@shiftsync.no")
         uuid_part = uid.replace("@shiftsync.no", "")
-        assert re.match(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', uuid_part)
+        try:
+            parsed = uuid.UUID(uuid_part)
+        except ValueError:
+            pytest.fail(f"UID is not a UUID: {uid}")
+        assert parsed.version == 4
+        assert str(parsed) == uuid_part  # canonical lowercase, hyphenated form
 
     def test_unique_uids_per_event(self):
         """Each event should have a unique UID."""
@@ -250,6 +256,6 @@ class TestGenerateIcs:
         ]
         ics_bytes = generate_ics(shifts, "Test")
         cal = Calendar.from_ical(ics_bytes)
-        events = [c for c in cal.walk() if c.name == "VEVENT"]
+        events = _events(cal)
         uids = [str(e.get("uid")) for e in events]
         assert len(set(uids)) == 2  # All unique
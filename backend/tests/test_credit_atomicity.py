@@ -10,19 +10,16 @@ from app.database import MAX_CREDIT_AMOUNT, MAX_CREDIT_BALANCE
 class TestAddCreditsValidation:
     """Tests for add_credits() input validation (H-04)."""
 
-    @pytest.mark.asyncio
     async def test_rejects_zero_amount(self):
         from app.database import add_credits
         with pytest.raises(ValueError, match="Credit amount must be between"):
             await add_credits("session-test", 0)
 
-    @pytest.mark.asyncio
     async def test_rejects_negative_amount(self):
         from app.database import add_credits
         with pytest.raises(ValueError, match="Credit amount must be between"):
             await add_credits("session-test", -5)
 
-    @pytest.mark.asyncio
     async def test_rejects_over_max_amount(self):
         from app.database import add_credits
         with pytest.raises(ValueError, match="Credit amount must be between"):
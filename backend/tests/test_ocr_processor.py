@@ -2,14 +2,17 @@
 Tests for OCR processor shift extraction and classification.
 Tests _extract_shifts() and _determine_shift_type() WITHOUT Tesseract.
 """
+import functools
+
 import pytest
 from unittest.mock import patch, MagicMock
 
 from app.models import Shift
 
 
+@functools.lru_cache(maxsize=1)
 def _make_processor():
-    """Create VaktplanProcessor with mocked Tesseract path."""
+    """Create VaktplanProcessor with mocked Tesseract path (shared; it holds no per-call state)."""
     with patch('app.ocr.processor.Path') as mock_path:
         mock_path.return_value.exists.return_value = True
         from app.ocr.processor import VaktplanProcessor
@@ -235,3 +238,11 @@ class TestOtsuThreshold:
         threshold = self.proc._otsu_threshold(img)
         # Threshold should be between the two groups
         assert 70 <= threshold < 180
+
+    def test_rgb_image_uses_grayscale_histogram(self):
+        """Non-grayscale input is thresholded on its luminance."""
+        from PIL import Image
+        img = Image.new('RGB', (100, 100), (40, 40, 40))
+        img.paste((210, 210, 210), (50, 0, 100, 100))
+        assert self.proc._otsu_threshold(img) == self.proc._otsu_threshold(img.convert('L'))
+        assert 40 <= self.proc._otsu_threshold(img) < 210
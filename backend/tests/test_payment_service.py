@@ -1,137 +1,65 @@
 """
 Tests for PaymentService quota logic and checkout session creation.
 """
+from types import SimpleNamespace
+
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 
 from app.payment import PaymentService
 
 
-class TestCheckQuota:
-    """Tests for PaymentService.check_quota() - returns (has_quota, free_remaining, credits)."""
-
-    @pytest.mark.asyncio
-    @patch('app.database.get_upload_count_this_month', new_callable=AsyncMock)
-    @patch('app.database.get_session', new_callable=AsyncMock)
-    async def test_premium_user_unlimited(self, mock_get_session, mock_count):
-        service = PaymentService()
-
-        mock_session = MagicMock()
-        mock_session.status = 'premium'
-        mock_session.credits = 0
-        mock_get_session.return_value = mock_session
-
-        has_quota, free_remaining, credits = await service.check_quota("session-123")
-        assert has_quota is True
-        assert free_remaining == -1  # Unlimited
-
-    @pytest.mark.asyncio
-    @patch('app.database.get_upload_count_this_month', new_callable=AsyncMock)
-    @patch('app.database.get_session', new_callable=AsyncMock)
-    async def test_free_user_with_quota(self, mock_get_session, mock_count):
-        service = PaymentService()
-
-        mock_get_session.return_value = None  # No session record
-        mock_count.return_value = 0
-
-        has_quota, free_remaining, credits = await service.check_quota("session-123")
-        assert has_quota is True
-        assert free_remaining == 2
-        assert credits == 0
-
-    @pytest.mark.asyncio
-    @patch('app.database.get_upload_count_this_month', new_callable=AsyncMock)
-    @patch('app.database.get_session', new_callable=AsyncMock)
-    async def test_free_user_one_used(self, mock_get_session, mock_count):
-        service = PaymentService()
-
-        mock_get_session.return_value = None
-        mock_count.return_value = 1
-
-        has_quota, free_remaining, credits = await service.check_quota("session-123")
-        assert has_quota is True
-        assert free_remaining == 1
-
-    @pytest.mark.asyncio
-    @patch('app.database.get_upload_count_this_month', new_callable=AsyncMock)
-    @patch('app.database.get_session', new_callable=AsyncMock)
-    async def test_free_user_quota_exceeded_no_credits(self, mock_get_session, mock_count):
-        service = PaymentService()
-
-        mock_get_session.return_value = None
-        mock_count.return_value = 2
-
-        has_quota, free_remaining, credits = await service.check_quota("session-123")
-        assert has_quota is False
-        assert free_remaining == 0
-        assert credits == 0
-
-    @pytest.mark.asyncio
-    @patch('app.database.get_upload_count_this_month', new_callable=AsyncMock)
-    @patch('app.database.get_session', new_callable=AsyncMock)
-    async def test_free_user_over_limit(self, mock_get_session, mock_count):
-        service = PaymentService()
-
-        mock_get_session.return_value = None
-        mock_count.return_value = 5  # Way over limit
-
-        has_quota, free_remaining, credits = await service.check_quota("session-123")
-        assert has_quota is False
-        assert free_remaining == 0
-
-    @pytest.mark.asyncio
-    @patch('app.database.get_upload_count_this_month', new_callable=AsyncMock)
-    @patch('app.database.get_session', new_callable=AsyncMock)
-    async def test_no_session_record(self, mock_get_session, mock_count):
-        service = PaymentService()
-
-        mock_get_session.return_value = None
-        mock_count.return_value = 0
+@pytest.fixture(scope="module")
+def service():
+    """PaymentService holds no per-call state, so one instance serves the module."""
+    return PaymentService()
 
-        has_quota, free_remaining, credits = await service.check_quota("new-session")
-        assert has_quota is True
-        assert free_remaining == 2
 
-    @pytest.mark.asyncio
-    @patch('app.database.get_upload_count_this_month', new_callable=AsyncMock)
-    @patch('app.database.get_session', new_callable=AsyncMock)
-    async def test_cancelled_gets_free_tier(self, mock_get_session, mock_count):
-        service = PaymentService()
+@pytest.fixture
+def db(monkeypatch):
+    """Stub the session lookup and monthly upload count; returns (get_session, count) mocks."""
+    mock_get_session = AsyncMock()
+    mock_count = AsyncMock()
+    monkeypatch.setattr('app.database.get_session', mock_get_session)
+    monkeypatch.setattr('app.database.get_upload_count_this_month', mock_count)
+    return mock_get_session, mock_count
 
-        mock_session = MagicMock()
-        mock_session.status = 'cancelled'
-        mock_session.credits = 0
-        mock_get_session.return_value = mock_session
-        mock_count.return_value = 1
 
-        has_quota, free_remaining, credits = await service.check_quota("session-123")
-        assert has_quota is True
-        assert free_remaining == 1  # Falls back to free tier
+@pytest.fixture
+def mock_stripe(monkeypatch):
+    """Stand-in for the stripe module in app.payment, configured with a test key."""
+    fake = MagicMock()
+    fake.api_key = "sk_test_123"
+    monkeypatch.setattr("app.payment.stripe", fake)
+    return fake
 
-    @pytest.mark.asyncio
-    @patch('app.database.get_upload_count_this_month', new_callable=AsyncMock)
-    @patch('app.database.get_session', new_callable=AsyncMock)
-    async def test_free_exhausted_but_has_credits(self, mock_get_session, mock_count):
-        service = PaymentService()
 
-        mock_session = MagicMock()
-        mock_session.status = 'free'
-        mock_session.credits = 10
-        mock_get_session.return_value = mock_session
-        mock_count.return_value = 2  # Free tier exhausted
+class TestCheckQuota:
+    """Tests for PaymentService.check_quota() - returns (has_quota, free_remaining, credits)."""
 
-        has_quota, free_remaining, credits = await service.check_quota("session-123")
-        assert has_quota is True
-        assert free_remaining == 0
-        assert credits == 10
+    @pytest.mark.parametrize("status, session_credits, upload_count, expected", [
+        pytest.param('premium', 0, 0, (True, -1, 0), id="premium_user_unlimited"),
+        pytest.param(None, 0, 0, (True, 2, 0), id="no_session_record"),
+        pytest.param(None, 0, 1, (True, 1, 0), id="free_user_one_used"),
+        pytest.param(None, 0, 2, (False, 0, 0), id="free_user_quota_exceeded_no_credits"),
+        pytest.param(None, 0, 5, (False, 0, 0), id="free_user_over_limit"),
+        pytest.param('cancelled', 0, 1, (True, 1, 0), id="cancelled_gets_free_tier"),
+        pytest.param('free', 10, 2, (True, 0, 10), id="free_exhausted_but_has_credits"),
+    ])
+    async def test_quota(self, service, db, status, session_credits, upload_count, expected):
+        mock_get_session, mock_count = db
+        # status None means no session record exists yet
+        mock_get_session.return_value = (
+            None if status is None else SimpleNamespace(status=status, credits=session_credits)
+        )
+        mock_count.return_value = upload_count
+
+        assert await service.check_quota("session-123") == expected
 
-    @pytest.mark.asyncio
     @patch('app.payment.settings')
-    @patch('app.database.get_upload_count_this_month', new_callable=AsyncMock)
-    @patch('app.database.get_session', new_callable=AsyncMock)
-    async def test_dev_bypass_requires_explicit_flag(self, mock_get_session, mock_count, mock_settings):
+    async def test_dev_bypass_requires_explicit_flag(self, mock_settings, service, db):
         """Dev environment alone should NOT bypass quota (L-01)."""
-        service = PaymentService()
+        mock_get_session, mock_count = db
 
         mock_settings.environment = "development"
         mock_settings.dev_bypass_quota = False
@@ -141,12 +69,9 @@ class TestCheckQuota:
         has_quota, free_remaining, credits = await service.check_quota("session-123")
         assert has_quota is False
 
-    @pytest.mark.asyncio
     @patch('app.payment.settings')
-    async def test_dev_bypass_with_flag_enabled(self, mock_settings):
+    async def test_dev_bypass_with_flag_enabled(self, mock_settings, service):
         """Dev environment with dev_bypass_quota=True should bypass."""
-        service = PaymentService()
-
         mock_settings.environment = "development"
         mock_settings.dev_bypass_quota = True
 
@@ -158,95 +83,70 @@ class TestCheckQuota:
 class TestCreateCheckoutSession:
     """Tests for PaymentService.create_checkout_session()."""
 
-    @pytest.mark.asyncio
-    async def test_no_stripe_key_raises(self):
-        service = PaymentService()
-
-        with patch('app.payment.stripe') as mock_stripe:
-            mock_stripe.api_key = None
-
-            with pytest.raises(ValueError, match="Stripe not configured"):
-                await service.create_checkout_session(
-                    success_url="https://shiftsync.no/success",
-                    cancel_url="https://shiftsync.no/cancel",
-                )
+    async def test_no_stripe_key_raises(self, service, mock_stripe):
+        mock_stripe.api_key = None
 
-    @pytest.mark.asyncio
-    async def test_calls_stripe_correctly(self):
-        service = PaymentService()
-
-        with patch('app.payment.stripe') as mock_stripe:
-            mock_stripe.api_key = "sk_test_123"
-            mock_session = MagicMock()
-            mock_session.url = "https://checkout.stripe.com/session/123"
-            mock_stripe.checkout.Session.create.return_value = mock_session
-
-            url = await service.create_checkout_session(
+        with pytest.raises(ValueError, match="Stripe not configured"):
+            await service.create_checkout_session(
                 success_url="https://shiftsync.no/success",
                 cancel_url="https://shiftsync.no/cancel",
-                customer_email="test@example.com",
-                client_reference_id="session-abc",
             )
 
-            assert url == "https://checkout.stripe.com/session/123"
-            mock_stripe.checkout.Session.create.assert_called_once()
-            call_kwargs = mock_stripe.checkout.Session.create.call_args[1]
-            assert call_kwargs['mode'] == 'subscription'
-            assert call_kwargs['customer_email'] == "test@example.com"
-            assert call_kwargs['client_reference_id'] == "session-abc"
-
-    @pytest.mark.asyncio
-    async def test_stripe_error_wrapped(self):
-        service = PaymentService()
-
-        with patch('app.payment.stripe') as mock_stripe:
-            mock_stripe.api_key = "sk_test_123"
-            mock_stripe.error.StripeError = Exception
-            mock_stripe.checkout.Session.create.side_effect = Exception("API error")
-
-            with pytest.raises(ValueError, match="Stripe error"):
-                await service.create_checkout_session(
-                    success_url="https://shiftsync.no/success",
-                    cancel_url="https://shiftsync.no/cancel",
-                )
+    async def test_calls_stripe_correctly(self, service, mock_stripe):
+        mock_session = MagicMock()
+        mock_session.url = "https://checkout.stripe.com/session/123"
+        mock_stripe.checkout.Session.create.return_value = mock_session
+
+        url = await service.create_checkout_session(
+            success_url="https://shiftsync.no/success",
+            cancel_url="https://shiftsync.no/cancel",
+            customer_email="test@example.com",
+            client_reference_id="session-abc",
+        )
+
+        assert url == "https://checkout.stripe.com/session/123"
+        mock_stripe.checkout.Session.create.assert_called_once()
+        call_kwargs = mock_stripe.checkout.Session.create.call_args[1]
+        assert call_kwargs['mode'] == 'subscription'
+        assert call_kwargs['customer_email'] == "test@example.com"
+        assert call_kwargs['client_reference_id'] == "session-abc"
+
+    async def test_stripe_error_wrapped(self, service, mock_stripe):
+        mock_stripe.error.StripeError = Exception
+        mock_stripe.checkout.Session.create.side_effect = Exception("API error")
+
+        with pytest.raises(ValueError, match="Stripe error"):
+            await service.create_checkout_session(
+                success_url="https://shiftsync.no/success",
+                cancel_url="https://shiftsync.no/cancel",
+            )
 
 
 class TestCreateCreditCheckoutSession:
     """Tests for PaymentService.create_credit_checkout_session()."""
 
-    @pytest.mark.asyncio
-    async def test_invalid_pack_raises(self):
-        service = PaymentService()
-
-        with patch('app.payment.stripe') as mock_stripe:
-            mock_stripe.api_key = "sk_test_123"
-
-            with pytest.raises(ValueError, match="Invalid pack_id"):
-                await service.create_credit_checkout_session(
-                    pack_id="invalid_pack",
-                    success_url="https://shiftsync.no/success",
-                    cancel_url="https://shiftsync.no/cancel",
-                )
-
-    @pytest.mark.asyncio
-    async def test_creates_payment_mode_session(self):
-        service = PaymentService()
-
-        with patch('app.payment.stripe') as mock_stripe:
-            mock_stripe.api_key = "sk_test_123"
-            mock_session = MagicMock()
-            mock_session.url = "https://checkout.stripe.com/session/456"
-            mock_stripe.checkout.Session.create.return_value = mock_session
-
-            url = await service.create_credit_checkout_session(
-                pack_id="pack_5",
+    async def test_invalid_pack_raises(self, service, mock_stripe):
+        with pytest.raises(ValueError, match="Invalid pack_id"):
+            await service.create_credit_checkout_session(
+                pack_id="invalid_pack",
                 success_url="https://shiftsync.no/success",
                 cancel_url="https://shiftsync.no/cancel",
-                client_reference_id="session-abc",
             )
 
-            assert url == "https://checkout.stripe.com/session/456"
-            call_kwargs = mock_stripe.checkout.Session.create.call_args[1]
-            assert call_kwargs['mode'] == 'payment'
-            assert call_kwargs['metadata']['pack_id'] == 'pack_5'
-            assert call_kwargs['metadata']['credits'] == '5'
+    async def test_creates_payment_mode_session(self, service, mock_stripe):
+        mock_session = MagicMock()
+        mock_session.url = "https://checkout.stripe.com/session/456"
+        mock_stripe.checkout.Session.create.return_value = mock_session
+
+        url = await service.create_credit_checkout_session(
+            pack_id="pack_5",
+            success_url="https://shiftsync.no/success",
+            cancel_url="https://shiftsync.no/cancel",
+            client_reference_id="session-abc",
+        )
+
+        assert url == "https://checkout.stripe.com/session/456"
+        call_kwargs = mock_stripe.checkout.Session.create.call_args[1]
+        assert call_kwargs['mode'] == 'payment'
+        assert call_kwargs['metadata']['pack_id'] == 'pack_5'
+        assert call_kwargs['metadata']['credits'] == '5'
@@ -13,18 +13,22 @@ from app.ocr.confidence_scorer import (
 from app.models import Shift
 
 
+# Validated once; read-only in these tests (variants via model_copy, which skips validation)
+_STD_SHIFT = Shift(
+    date="01.12.2025",
+    start_time="07:00",
+    end_time="15:00",
+    shift_type="tidlig",
+    confidence=0.9
+)
+_SHORT_SHIFT = _STD_SHIFT.model_copy(update={"end_time": "09:00"})
+
+
 class TestValidateShift:
     """Tests for shift validation."""
 
     def test_valid_shift(self):
-        shift = Shift(
-            date="01.12.2025",
-            start_time="07:00",
-            end_time="15:00",
-            shift_type="tidlig",
-            confidence=0.9
-        )
-        assert validate_shift(shift) is True
+        assert validate_shift(_STD_SHIFT) is True
 
     def test_invalid_date_format_rejected_by_pydantic(self):
         """Pydantic now rejects invalid date formats at construction."""
@@ -65,15 +69,7 @@ class TestConfidenceScoring:
 
     def test_high_confidence_text(self):
         ocr_text = "desember 2025\nmandag 07:00 - 15:00\n1"
-        shifts = [
-            Shift(
-                date="01.12.2025",
-                start_time="07:00",
-                end_time="15:00",
-                shift_type="tidlig",
-                confidence=0.9
-            )
-        ]
+        shifts = [_STD_SHIFT]
         score = calculate_confidence(ocr_text, shifts)
         assert score > 0.7
 
@@ -96,27 +92,11 @@ class TestGenerateWarnings:
         assert any("Lav sikkerhet" in w for w in warnings)
 
     def test_short_shift_warning(self):
-        shifts = [
-            Shift(
-                date="01.12.2025",
-                start_time="07:00",
-                end_time="09:00",
-                shift_type="tidlig",
-                confidence=0.9
-            )
-        ]
+        shifts = [_SHORT_SHIFT]
         warnings = generate_warnings(shifts, 0.9)
         assert any("kort" in w for w in warnings)
 
     def test_no_warnings_for_normal_shifts(self):
-        shifts = [
-            Shift(
-                date="01.12.2025",
-                start_time="07:00",
-                end_time="15:00",
-                shift_type="tidlig",
-                confidence=0.9
-            )
-        ]
+        shifts = [_STD_SHIFT]
         warnings = generate_warnings(shifts, 0.9)
         assert len(warnings) == 0
@@ -2,30 +2,70 @@
 Security tests for ShiftSync API.
 Tests for SQL injection, XSS, file upload vulnerabilities, rate limiting, etc.
 """
-import pytest
+import asyncio
 import io
 
+import httpx
+import pytest
+
+
+# Minimal payloads: just the magic bytes plus padding
+_EXE_BYTES = b'MZ' + bytes(100)  # PE header signature
+_PNG_BYTES = bytes([0x89, 0x50, 0x4E, 0x47]) + bytes(100)
+_JPEG_BYTES = bytes([0xFF, 0xD8, 0xFF, 0xE0]) + bytes(100)
+
+
+class _StreamedUpload:
+    """
+    Multipart upload of `size` zero bytes, generated lazily in 64KB chunks.
+    Content-Length is declared up front, like a real client streaming a file,
+    unless `declare_length` is False (the body is then sent chunked).
+    """
+
+    _BOUNDARY = "shiftsync-streamed-upload"
+    _CHUNK = bytes(64 * 1024)
+
+    def __init__(self, filename: str, size: int, declare_length: bool = True):
+        self._head = (
+            f'--{self._BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n'
+        ).encode()
+        self._tail = f'\r\n--{self._BOUNDARY}--\r\n'.encode()
+        self._size = size
+        self.bytes_sent = 0
+        self.headers = {"Content-Type": f"multipart/form-data; boundary={self._BOUNDARY}"}
+        if declare_length:
+            self.headers["Content-Length"] = str(len(self._head) + size + len(self._tail))
+
+    def __iter__(self):
+        yield self._head
+        remaining = self._size
+        while remaining:
+            chunk = self._CHUNK[:remaining]
+            remaining -= len(chunk)
+            self.bytes_sent += len(chunk)
+            yield chunk
+        yield self._tail
+
 
 class TestSQLInjection:
     """Tests for SQL injection prevention."""
     
-    def test_upload_id_injection(self, client):
+    @pytest.mark.parametrize("malicious_id", [
+        "'; DROP TABLE upload_analytics; --",
+        "1 OR 1=1",
+        "1; DELETE FROM users WHERE 1=1",
+        "1 UNION SELECT * FROM users",
+        "' OR '1'='1",
+    ])
+    def test_upload_id_injection(self, client, malicious_id):
         """Test that SQL injection in upload_id is blocked."""
-        # Attempt SQL injection via upload_id
-        malicious_ids = [
-            "'; DROP TABLE upload_analytics; --",
-            "1 OR 1=1",
-            "1; DELETE FROM users WHERE 1=1",
-            "1 UNION SELECT * FROM users",
-            "' OR '1'='1",
-        ]
-        
-        for malicious_id in malicious_ids:
-            response = client.post("/api/process", json={
-                "upload_id": malicious_id
-            })
-            # Should be rejected by validation (not 500 server error)
-            assert response.status_code in [400, 422], f"Potential SQL injection: {malicious_id}"
+        response = client.post("/api/process", json={
+            "upload_id": malicious_id
+        })
+        # Should be rejected by validation (not 500 server error)
+        assert response.status_code in [400, 422], f"Potential SQL injection: {malicious_id}"
     
     def test_analytics_days_injection(self, client, api_key_header):
         """Test that SQL injection via days parameter is blocked."""
@@ -39,35 +79,33 @@ class TestSQLInjection:
 class TestXSSPrevention:
     """Tests for XSS prevention."""
     
-    def test_owner_name_xss(self, client):
+    @pytest.mark.parametrize("payload", [
+        "<script>alert('xss')</script>",
+        "<img src=x onerror=alert('xss')>",
+        "javascript:alert('xss')",
+        "<svg onload=alert('xss')>",
+        "'-alert('xss')-'",
+    ])
+    def test_owner_name_xss(self, client, payload):
         """Test that XSS in owner_name is sanitized."""
-        xss_payloads = [
-            "<script>alert('xss')</script>",
-            "<img src=x onerror=alert('xss')>",
-            "javascript:alert('xss')",
-            "<svg onload=alert('xss')>",
-            "'-alert('xss')-'",
-        ]
+        response = client.post("/api/generate-calendar", json={
+            "shifts": [
+                {
+                    "date": "01.01.2024",
+                    "start_time": "08:00",
+                    "end_time": "16:00",
+                    "shift_type": "tidlig"
+                }
+            ],
+            "owner_name": payload
+        })
         
-        for payload in xss_payloads:
-            response = client.post("/api/generate-calendar", json={
-                "shifts": [
-                    {
-                        "date": "01.01.2024",
-                        "start_time": "08:00",
-                        "end_time": "16:00",
-                        "shift_type": "tidlig"
-                    }
-                ],
-                "owner_name": payload
-            })
-            
-            if response.status_code == 200:
-                # Check that XSS payload is not in response
-                content = response.content.decode('utf-8')
-                assert '<script>' not in content.lower()
-                assert 'javascript:' not in content.lower()
-                assert 'onerror=' not in content.lower()
+        if response.status_code == 200:
+            # Check that XSS payload is not in response
+            content = response.content.decode('utf-8')
+            assert '<script>' not in content.lower()
+            assert 'javascript:' not in content.lower()
+            assert 'onerror=' not in content.lower()
 
 
 class TestFileUploadSecurity:
@@ -75,33 +113,43 @@ class TestFileUploadSecurity:
     
     def test_reject_exe_file(self, client):
         """Test that executable files are rejected."""
-        # Create fake exe content
-        exe_content = b'MZ' + b'\x00' * 100  # PE header signature
-        
         response = client.post(
             "/api/upload",
-            files={"file": ("malware.exe", io.BytesIO(exe_content), "application/x-msdownload")}
+            files={"file": ("malware.exe", io.BytesIO(_EXE_BYTES), "application/x-msdownload")}
         )
         assert response.status_code in [400, 415]
     
     def test_reject_oversized_file(self, client):
         """Test that files over 10MB are rejected."""
-        large_content = b'0' * (11 * 1024 * 1024)  # 11MB
+        upload = _StreamedUpload("large.jpg", 11 * 1024 * 1024)  # 11MB
         
         response = client.post(
             "/api/upload",
-            files={"file": ("large.jpg", io.BytesIO(large_content), "image/jpeg")}
+            content=upload,
+            headers=upload.headers,
+        )
+        assert response.status_code == 413
+        # Rejected from the declared size; no file bytes had to be generated
+        assert upload.bytes_sent == 0
+
+    def test_reject_oversized_file_without_content_length(self, client):
+        """Test that oversized files are caught by validate_file when no size is declared."""
+        upload = _StreamedUpload("large.jpg", 11 * 1024 * 1024, declare_length=False)
+
+        response = client.post(
+            "/api/upload",
+            content=upload,
+            headers=upload.headers,
         )
         assert response.status_code == 413
+        assert upload.bytes_sent == 11 * 1024 * 1024
     
     def test_reject_fake_extension(self, client):
         """Test that files with mismatched content are rejected."""
-        # Create file with .jpg extension but PNG content
-        png_header = bytes([0x89, 0x50, 0x4E, 0x47])  # PNG magic bytes
-        
+        # .jpg extension but PNG content
         response = client.post(
             "/api/upload",
-            files={"file": ("image.jpg", io.BytesIO(png_header + b'\x00' * 100), "image/jpeg")}
+            files={"file": ("image.jpg", io.BytesIO(_PNG_BYTES), "image/jpeg")}
         )
         # Should be rejected due to signature mismatch
         assert response.status_code in [400, 415]
@@ -110,22 +158,23 @@ class TestFileUploadSecurity:
 class TestRateLimiting:
     """Tests for rate limiting."""
     
-    def test_upload_rate_limit(self, client):
+    async def test_upload_rate_limit(self, client, monkeypatch, tmp_path):
         """Test that upload endpoint is rate limited."""
-        # Create minimal valid JPEG
-        jpeg_content = bytes([0xFF, 0xD8, 0xFF, 0xE0]) + b'\x00' * 100
-        
-        # Make 15 requests (limit is 10/minute)
-        responses = []
-        for i in range(15):
-            response = client.post(
-                "/api/upload",
-                files={"file": (f"test{i}.jpg", io.BytesIO(jpeg_content), "image/jpeg")}
-            )
-            responses.append(response.status_code)
+        # `client` resets limiter state and starts the app; requests go through ASGI directly
+        from app.main import app
+        # Accepted uploads hit local storage; keep them out of the working tree
+        monkeypatch.setattr("app.api.upload.storage.UPLOAD_DIR", tmp_path)
+
+        # Make 15 concurrent requests (limit is 10/minute)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as ac:
+            responses = await asyncio.gather(*(
+                ac.post("/api/upload", files={"file": (f"test{i}.jpg", io.BytesIO(_JPEG_BYTES), "image/jpeg")})
+                for i in range(15)
+            ))
         
         # At least some should be rate limited (429)
-        assert 429 in responses, "Rate limiting not working"
+        assert 429 in [r.status_code for r in responses], "Rate limiting not working"
 
 
 class TestAuthenticationSecurity:
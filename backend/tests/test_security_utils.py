@@ -12,6 +12,7 @@ from app.security import (
     generate_download_token,
     validate_download_token,
     validate_file_signature,
+    upload_exceeds_size_limit,
     get_user_identifier,
     get_country_code,
 )
@@ -76,6 +77,17 @@ class TestDownloadToken:
             validate_download_token("upload-123", tampered_token, "session-abc")
         assert exc_info.value.status_code == 403
 
+    @patch('app.security.settings')
+    def test_rotated_salt_rejects_old_token(self, mock_settings):
+        """The cached signing key follows SECRET_SALT changes."""
+        mock_settings.secret_salt = "test_salt_for_testing_minimum_32chars!"
+        token = generate_download_token("upload-123", "session-abc")
+
+        mock_settings.secret_salt = "rotated_salt_for_testing_minimum_32chars"
+        with pytest.raises(HTTPException) as exc_info:
+            validate_download_token("upload-123", token, "session-abc")
+        assert exc_info.value.status_code == 403
+
     @patch('app.security.settings')
     def test_malformed_token_rejected(self, mock_settings):
         mock_settings.secret_salt = "test_salt_for_testing_minimum_32chars!"
@@ -128,6 +140,30 @@ class TestValidateFileSignature:
         assert validate_file_signature(b'', "image/jpeg") is False
 
 
+class TestUploadSizePreflight:
+    """Tests for upload_exceeds_size_limit()."""
+
+    @patch('app.security.settings')
+    def test_within_limit(self, mock_settings):
+        mock_settings.max_file_size_mb = 10
+        assert upload_exceeds_size_limit(str(10 * 1024 * 1024)) is False
+
+    @patch('app.security.settings')
+    def test_over_limit(self, mock_settings):
+        mock_settings.max_file_size_mb = 10
+        assert upload_exceeds_size_limit(str(11 * 1024 * 1024)) is True
+
+    def test_missing_or_malformed_header_passes(self):
+        assert upload_exceeds_size_limit(None) is False
+        assert upload_exceeds_size_limit("") is False
+        assert upload_exceeds_size_limit("-1") is False
+        assert upload_exceeds_size_limit("abc") is False
+
+    def test_non_ascii_digit_header_passes(self):
+        assert upload_exceeds_size_limit("²") is False
+        assert upload_exceeds_size_limit("١٢") is False
+
+
 class TestGetUserIdentifier:
     """Tests for get_user_identifier()."""
 
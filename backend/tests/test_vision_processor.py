@@ -4,10 +4,13 @@ No actual API calls are made.
 """
 import json
 import pytest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock, PropertyMock
 from pathlib import Path
 
-from app.ocr.vision_processor import VisionProcessor, SUPPORTED_MIME_TYPES
+from app.ocr.vision_processor import (
+    VisionProcessor, SUPPORTED_MIME_TYPES, _mime_for, get_vision_processor, close_vision_processor,
+)
 
 
 def _make_mock_response(shifts_data, notes=None, prompt_tokens=100, completion_tokens=50):
@@ -164,6 +167,93 @@ class TestVisionProcessorParsing:
         with pytest.raises(ValueError, match="empty response"):
             proc.process_image(str(img_file))
 
+    def test_multiple_images_single_call(self, tmp_path):
+        """process_images sends every page in one API call and merges the shifts."""
+        proc = _make_processor()
+        proc.client.chat.completions.create.return_value = _make_mock_response([
+            {"date": "01.12.2025", "start_time": "07:00", "end_time": "15:00",
+             "shift_type": "tidlig", "confidence": 0.9},
+            {"date": "15.12.2025", "start_time": "22:00", "end_time": "06:00",
+             "shift_type": "natt", "confidence": 0.8},
+        ])
+
+        paths = []
+        for name in ("page1.jpg", "page2.jpg"):
+            img_file = tmp_path / name
+            img_file.write_bytes(b'\xff\xd8\xff\xe0' + b'\x00' * 100)
+            paths.append(str(img_file))
+
+        shifts, _ = proc.process_images(paths)
+        assert len(shifts) == 2
+        assert proc.client.chat.completions.create.call_count == 1
+        content = proc.client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        assert [part["type"] for part in content] == ["text", "image_url", "image_url"]
+
+    def test_no_images_raises_without_api_call(self):
+        """An empty image list is rejected before any request is made."""
+        proc = _make_processor()
+
+        with pytest.raises(ValueError, match="At least one image"):
+            proc.process_images([])
+        proc.client.chat.completions.create.assert_not_called()
+
+    def test_invalid_json_raises(self, tmp_path):
+        """Malformed JSON from the model raises ValueError."""
+        proc = _make_processor()
+        mock_choice = MagicMock()
+        mock_choice.message.content = '{"shifts": ['
+        mock_response = MagicMock()
+        mock_response.choices = [mock_choice]
+        mock_response.usage = None
+        proc.client.chat.completions.create.return_value = mock_response
+
+        img_file = tmp_path / "test.jpg"
+        img_file.write_bytes(b'\xff\xd8\xff\xe0' + b'\x00' * 100)
+
+        with pytest.raises(ValueError, match="invalid JSON"):
+            proc.process_image(str(img_file))
+
+
+class TestSharedProcessor:
+    """Tests for the per-process VisionProcessor singleton."""
+
+    @patch('app.ocr.vision_processor.httpx.Client')
+    @patch('app.ocr.vision_processor.OpenAI')
+    def test_same_processor_and_client_reused(self, mock_openai, mock_http, tmp_path):
+        """Repeated lookups return one processor whose client serves every call."""
+        mock_openai.return_value.chat.completions.create.return_value = _make_mock_response([])
+        img_file = tmp_path / "test.jpg"
+        img_file.write_bytes(b'\xff\xd8\xff\xe0' + b'\x00' * 100)
+
+        close_vision_processor()
+        try:
+            get_vision_processor("sk-test").process_image(str(img_file))
+            get_vision_processor("sk-test").process_image(str(img_file))
+        finally:
+            close_vision_processor()
+
+        mock_openai.assert_called_once()
+        mock_http.assert_called_once()
+        assert mock_openai.return_value.chat.completions.create.call_count == 2
+
+    @patch('app.ocr.vision_processor.httpx.Client')
+    @patch('app.ocr.vision_processor.OpenAI')
+    def test_new_key_closes_old_client(self, mock_openai, mock_http):
+        """Replacing or closing the shared processor closes its OpenAI client."""
+        first_client, second_client = MagicMock(), MagicMock()
+        mock_openai.side_effect = [first_client, second_client]
+
+        close_vision_processor()
+        try:
+            first = get_vision_processor("sk-old")
+            second = get_vision_processor("sk-new")
+        finally:
+            close_vision_processor()
+
+        assert first is not second
+        first_client._client.close.assert_called_once()
+        second_client._client.close.assert_called_once()
+
 
 class TestMimeType:
     """Tests for MIME type detection."""
@@ -177,6 +267,10 @@ class TestMimeType:
     def test_jpeg_mime(self):
         assert SUPPORTED_MIME_TYPES['.jpeg'] == 'image/jpeg'
 
+    def test_suffix_case_insensitive_with_jpeg_default(self):
+        assert _mime_for('.PNG') == 'image/png'
+        assert _mime_for('.bmp') == 'image/jpeg'
+
 
 class TestImageEncoding:
     """Tests for image encoding and compression."""
@@ -197,14 +291,10 @@ class TestImageEncoding:
         import random
         proc = _make_processor()
 
-        # Create a noisy image that won't compress well as PNG (> 2MB)
-        random.seed(42)
-        img = PILImage.new('RGB', (2000, 2000))
-        pixels = [
-            (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
-            for _ in range(2000 * 2000)
-        ]
-        img.putdata(pixels)
+        # Create a noisy image that won't compress well as PNG (> 2MB);
+        # random bytes go straight into the pixel buffer
+        noise = random.Random(42).randbytes(2000 * 2000 * 3)
+        img = PILImage.frombytes('RGB', (2000, 2000), noise)
         img_file = tmp_path / "large.png"
         img.save(str(img_file))
 
@@ -219,22 +309,27 @@ class TestImageEncoding:
 class TestRetryLogic:
     """Tests for retry behavior on transient failures."""
 
-    def test_retry_on_rate_limit(self, tmp_path):
+    def test_retry_on_rate_limit(self, tmp_path, monkeypatch):
         """RateLimitError triggers retry, succeeds on second attempt."""
         from openai import RateLimitError
 
         proc = _make_processor()
-
-        # First call raises RateLimitError, second succeeds
-        mock_error_response = MagicMock()
-        mock_error_response.status_code = 429
-        mock_error_response.headers = {}
-        mock_error_response.json.return_value = {"error": {"message": "rate limited"}}
+        # Skip the real backoff sleep between attempts
+        monkeypatch.setattr(VisionProcessor._call_vision_api.retry, "sleep", lambda seconds: None)
+
+        # First call raises RateLimitError, second succeeds; the error only
+        # reads these attributes, so a plain namespace stands in for httpx.Response
+        error_response = SimpleNamespace(
+            status_code=429,
+            headers={},
+            request=None,
+            json=lambda: {"error": {"message": "rate limited"}},
+        )
 
         proc.client.chat.completions.create.side_effect = [
             RateLimitError(
                 message="rate limited",
-                response=mock_error_response,
+                response=error_response,
                 body={"error": {"message": "rate limited"}},
             ),
             _make_mock_response([
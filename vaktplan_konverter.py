@@ -1,34 +1,106 @@
+import logging
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 import pytesseract
 from datetime import datetime, timedelta
-from icalendar import Calendar, Event
+from typing import NamedTuple
 import re
 from dotenv import load_dotenv
 from pathlib import Path
 
-# Last inn miljøvariabler fra .env fil
-load_dotenv()
+class Settings(NamedTuple):
+    """Konfigurasjon fra miljøet / .env-filen."""
+    tesseract_path: str
+    ocr_language: str
+    input_folder: str
+    output_folder: str
+    shift_duration: int
+    shift_owner: str
+    log_level: str
 
-# Konfigurer pytesseract med sti fra .env eller standard
-TESSERACT_PATH = os.getenv('TESSERACT_PATH', r'C:\Program Files\Tesseract-OCR\tesseract.exe')
-OCR_LANGUAGE = os.getenv('OCR_LANGUAGE', 'nor')
-INPUT_FOLDER = os.getenv('INPUT_FOLDER', 'Bilder')
-OUTPUT_FOLDER = os.getenv('OUTPUT_FOLDER', 'KalenderFiler')
-SHIFT_DURATION = int(os.getenv('DEFAULT_SHIFT_DURATION_HOURS', '8'))
-SHIFT_OWNER = os.getenv('SHIFT_OWNER_NAME', 'Cathrine')
+def _loggnivå(navn):
+    """Gyldig loggnivå fra LOG_LEVEL; ukjente verdier gir INFO i stedet for krasj ved oppstart."""
+    navn = navn.upper()
+    # getLevelName gir tallverdien for kjente nivånavn (fungerer fra Python 3.8)
+    return navn if isinstance(logging.getLevelName(navn), int) else 'INFO'
 
-# Valider at Tesseract er installert
-if not Path(TESSERACT_PATH).exists():
-    print(f"[FEIL] Tesseract OCR ikke funnet paa: {TESSERACT_PATH}")
-    print("[INFO] Last ned og installer Tesseract fra:")
-    print("   https://github.com/UB-Mannheim/tesseract/wiki")
-    print("\n[TIP] Eller oppdater TESSERACT_PATH i .env filen")
-    sys.exit(1)
+def _settings():
+    """Leser konfigurasjonen fra .env og miljøvariabler."""
+    # Last inn miljøvariabler fra .env fil
+    load_dotenv()
+    return Settings(
+        tesseract_path=os.getenv('TESSERACT_PATH', r'C:\Program Files\Tesseract-OCR\tesseract.exe'),
+        ocr_language=os.getenv('OCR_LANGUAGE', 'nor'),
+        input_folder=os.getenv('INPUT_FOLDER', 'Bilder'),
+        output_folder=os.getenv('OUTPUT_FOLDER', 'KalenderFiler'),
+        shift_duration=int(os.getenv('DEFAULT_SHIFT_DURATION_HOURS', '8')),
+        shift_owner=os.getenv('SHIFT_OWNER_NAME', 'Cathrine'),
+        log_level=_loggnivå(os.getenv('LOG_LEVEL', 'INFO')),
+    )
 
-pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
-print(f"[OK] Tesseract funnet: {TESSERACT_PATH}")
+# Leses én gang ved import (også i OCR-prosessene)
+SETTINGS = _settings()
+
+# Logger for vakt-ekstraksjon; [DEBUG]-meldinger vises bare med LOG_LEVEL=DEBUG
+log = logging.getLogger('vaktplan')
+if not log.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(_handler)
+    log.setLevel(SETTINGS.log_level)
+    log.propagate = False
+
+# Konfigurer pytesseract med sti fra .env eller standard (også i OCR-prosessene)
+pytesseract.pytesseract.tesseract_cmd = SETTINGS.tesseract_path
+
+def sjekk_tesseract():
+    """Avslutter programmet hvis Tesseract ikke er installert."""
+    if not Path(SETTINGS.tesseract_path).exists():
+        print(f"[FEIL] Tesseract OCR ikke funnet paa: {SETTINGS.tesseract_path}")
+        print("[INFO] Last ned og installer Tesseract fra:")
+        print("   https://github.com/UB-Mannheim/tesseract/wiki")
+        print("\n[TIP] Eller oppdater TESSERACT_PATH i .env filen")
+        sys.exit(1)
+    print(f"[OK] Tesseract funnet: {SETTINGS.tesseract_path}")
+
+# Terskel-tabell for svart/hvitt (0-127 -> svart, 128-255 -> hvit)
+TERSKEL_TABELL = [0] * 128 + [255] * 128
+
+# Filendelser som behandles som vaktplan-bilder
+BILDE_ENDELSER = frozenset({'.png', '.jpg', '.jpeg'})
+
+# iCalendar-rammen for den genererte filen (RFC 5545, CRLF-linjeskift)
+KALENDER_START = 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Vaktplan Konverter//OCR til iCal//NO\r\n'
+KALENDER_SLUTT = 'END:VCALENDAR\r\n'
+# Escaping av TEXT-verdier (SUMMARY, DESCRIPTION)
+TEKST_ESCAPES = str.maketrans({'\\': '\\\\', ';': '\\;', ',': '\\,', '\n': '\\n'})
+
+# Vakttype etter starttime 00-23: tidlig 06-11, mellom 12-15, kveld 16-21, ellers natt
+VAKTTYPE_ETTER_TIME = ('natt',) * 6 + ('tidlig',) * 6 + ('mellom',) * 4 + ('kveld',) * 6 + ('natt',) * 2
+
+# Norske månedsnavn -> månedsnummer
+MÅNEDER = {
+    'januar': 1, 'februar': 2, 'mars': 3, 'april': 4,
+    'mai': 5, 'juni': 6, 'juli': 7, 'august': 8,
+    'september': 9, 'oktober': 10, 'november': 11, 'desember': 12
+}
+
+# Regex-mønstre kompileres én gang; IGNORECASE gjør at OCR-teksten ikke må gjøres om til små bokstaver
+# Måned og år (alle 12 måneder)
+MÅNED_ÅR_MØNSTER = re.compile(
+    r'(januar|februar|mars|april|mai|juni|juli|august|september|oktober|november|desember) (\d{4})',
+    re.IGNORECASE,
+)
+# Vaktlinjer med både start- og slutt-tid (forbedret mønster)
+# Håndterer nå også mellomrom i dagnummer (f.eks. "2 3" → 23)
+# Tillater tekst/whitespace mellom tid og dag (greedy men begrenset til 30 tegn)
+# VIKTIG: \d\s+\d må komme FØRST i alternativet, ellers matcher \d{1,2} bare første siffer!
+VAKT_MØNSTER = re.compile(
+    r'(?:mandag|tirsdag|onsdag|torsdag|fredag|l.rdag|.rdag|søndag|s.ndag)\s+(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*[^\d]{0,30}?(\d\s+\d|\d{1,2})',
+    re.IGNORECASE,
+)
 
 def forbedre_bilde(bilde_sti):
     """Forbedrer bildekvaliteten for bedre OCR-resultater."""
@@ -36,42 +108,32 @@ def forbedre_bilde(bilde_sti):
     # Konverter til gråskala
     bilde = bilde.convert('L')
     # Øk kontrasten
-    bilde = bilde.point(lambda x: 0 if x < 128 else 255, '1')
+    bilde = bilde.point(TERSKEL_TABELL, '1')
     return bilde
 
 def ekstraher_dato_og_tid(tekst):
     """Ekstraherer dato og klokkeslett fra OCR-tekst."""
-    print("[OCR] Resultat:", tekst[:200], "..." if len(tekst) > 200 else "")  # Vis første 200 tegn
+    log.debug("[OCR] Resultat: %s %s", tekst[:200], "..." if len(tekst) > 200 else "")  # Vis første 200 tegn
     
     # Finn måned og år (alle 12 måneder)
-    måned_år_mønster = r'(januar|februar|mars|april|mai|juni|juli|august|september|oktober|november|desember) (\d{4})'
-    måned_år = re.search(måned_år_mønster, tekst.lower())
+    måned_år = MÅNED_ÅR_MØNSTER.search(tekst)
     
-    # Finn vaktlinjer med både start- og slutt-tid (forbedret mønster)
-    # Håndterer nå også mellomrom i dagnummer (f.eks. "2 3" → 23)
-    # Tillater tekst/whitespace mellom tid og dag (greedy men begrenset til 30 tegn)
-    # VIKTIG: \d\s+\d må komme FØRST i alternativet, ellers matcher \d{1,2} bare første siffer!
-    vakt_mønster = r'(?:mandag|tirsdag|onsdag|torsdag|fredag|l.rdag|.rdag|søndag|s.ndag)\s+(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*[^\d]{0,30}?(\d\s+\d|\d{1,2})'
-    vakter = re.finditer(vakt_mønster, tekst.lower())
+    # Finn vaktlinjer med både start- og slutt-tid
+    vakter = VAKT_MØNSTER.finditer(tekst)
     
     resultater = []
     funnet_vakter = set()  # For å unngå duplikater
     
     if måned_år:
         måned_navn, år = måned_år.groups()
-        måneder = {
-            'januar': 1, 'februar': 2, 'mars': 3, 'april': 4,
-            'mai': 5, 'juni': 6, 'juli': 7, 'august': 8,
-            'september': 9, 'oktober': 10, 'november': 11, 'desember': 12
-        }
-        måned_nummer = måneder.get(måned_navn.lower())
+        måned_nummer = MÅNEDER.get(måned_navn.lower())
         
         if måned_nummer:
             for vakt in vakter:
                 start_time, start_min, slutt_time, slutt_min, dag = vakt.groups()
                 
                 # Debug: Vis rå-match
-                print(f"[DEBUG] Match: {start_time}:{start_min}-{slutt_time}:{slutt_min}, dag='{dag}'")
+                log.debug("[DEBUG] Match: %s:%s-%s:%s, dag='%s'", start_time, start_min, slutt_time, slutt_min, dag)
                 
                 # Fjern mellomrom fra dag (f.eks. "2 3" → "23")
                 dag = dag.replace(' ', '')
@@ -80,57 +142,72 @@ def ekstraher_dato_og_tid(tekst):
                 try:
                     dag_int = int(dag)
                     if dag_int < 1 or dag_int > 31:
-                        print(f"[DEBUG] Ugyldig dag funnet: {dag} - hopper over")
+                        log.debug("[DEBUG] Ugyldig dag funnet: %s - hopper over", dag)
                         continue
                 except ValueError:
-                    print(f"[DEBUG] Kunne ikke parse dag: {dag} - hopper over")
+                    log.debug("[DEBUG] Kunne ikke parse dag: %s - hopper over", dag)
                     continue
                 
                 # Lag en unik nøkkel for denne vakten
                 dato = f"{dag.zfill(2)}.{str(måned_nummer).zfill(2)}.{år}"
                 start_tid = f"{start_time.zfill(2)}:{start_min}"
                 slutt_tid = f"{slutt_time.zfill(2)}:{slutt_min}"
-                vakt_nøkkel = f"{dato}_{start_tid}_{slutt_tid}"
+                vakt_nøkkel = (dato, start_tid, slutt_tid)
                 
                 # Sjekk om vi allerede har lagt til denne vakten
                 if vakt_nøkkel in funnet_vakter:
-                    print(f"[DEBUG] Duplikat hopper over: {dato} {start_tid}-{slutt_tid}")
+                    log.debug("[DEBUG] Duplikat hopper over: %s %s-%s", dato, start_tid, slutt_tid)
                     continue
                 
                 funnet_vakter.add(vakt_nøkkel)
-                print(f"[+] Funnet vakt: {dato} {start_tid}-{slutt_tid}")
+                log.info("[+] Funnet vakt: %s %s-%s", dato, start_tid, slutt_tid)
                 resultater.append((dato, start_tid, slutt_tid))
         else:
-            print(f"[ADVARSEL] Ukjent maaned: {måned_navn}")
+            log.warning("[ADVARSEL] Ukjent maaned: %s", måned_navn)
     else:
-        print("[ADVARSEL] Ingen maaned/aar funnet i OCR-teksten")
+        log.warning("[ADVARSEL] Ingen maaned/aar funnet i OCR-teksten")
     
     return resultater
 
 def bestem_vakttype(start_klokkeslett, slutt_klokkeslett=None):
     """Bestemmer vakttype basert på start- og slutt-klokkeslett."""
     start_time = int(start_klokkeslett.split(':')[0])
-    
-    # Hvis vi har slutt-tid, sjekk om det er nattevakt (går over midnatt)
-    if slutt_klokkeslett:
-        slutt_time = int(slutt_klokkeslett.split(':')[0])
-        # Nattevakt hvis den starter sent og slutter tidlig (går over midnatt)
-        if start_time >= 20 or start_time < 6:
-            if slutt_time <= 10:  # Slutter på morgenen
-                return "natt"
-    
-    # Standard klassifisering basert på start-tid
-    if 6 <= start_time < 12:
-        return "tidlig"
-    elif 12 <= start_time < 16:
-        return "mellom"
-    elif 16 <= start_time < 22:
-        return "kveld"
-    else:
-        return "natt"  # 22:00-06:00
 
-def lag_kalenderhendelse(kalender, dato, start_klokkeslett, slutt_klokkeslett, vakttype):
-    """Legger til en kalenderhendelse i den eksisterende kalenderen."""
+    # Nattevakt hvis den starter sent og slutter på morgenen (går over midnatt);
+    # øvrige nattetimer (22:00-06:00) er allerede "natt" i tabellen
+    if slutt_klokkeslett and 20 <= start_time < 22 and int(slutt_klokkeslett.split(':')[0]) <= 10:
+        return "natt"
+
+    # Standard klassifisering basert på start-tid (OCR kan gi timer over 23)
+    return VAKTTYPE_ETTER_TIME[start_time] if start_time < 24 else "natt"
+
+def brett_linje(linje):
+    """Bretter en iCalendar-linje ved 75 oktetter (uten å dele UTF-8-tegn) og avslutter med CRLF."""
+    tegn = []
+    oktetter = 0
+    for t in linje:
+        bredde = len(t.encode('utf-8'))
+        oktetter += bredde
+        if oktetter >= 75:
+            tegn.append('\r\n ')
+            oktetter = bredde
+        tegn.append(t)
+    tegn.append('\r\n')
+    return ''.join(tegn)
+
+def lag_vevent(sammendrag, start_dato_tid, slutt_dato_tid, beskrivelse):
+    """Formaterer én VEVENT-blokk direkte som tekst."""
+    return (
+        'BEGIN:VEVENT\r\n'
+        + brett_linje(f"SUMMARY:{sammendrag.translate(TEKST_ESCAPES)}")
+        + f"DTSTART:{start_dato_tid:%Y%m%dT%H%M%S}\r\n"
+        + f"DTEND:{slutt_dato_tid:%Y%m%dT%H%M%S}\r\n"
+        + brett_linje(f"DESCRIPTION:{beskrivelse.translate(TEKST_ESCAPES)}")
+        + 'END:VEVENT\r\n'
+    )
+
+def lag_kalenderhendelse(hendelser, dato, start_klokkeslett, slutt_klokkeslett, vakttype):
+    """Legger til en kalenderhendelse (VEVENT-tekst) i listen over hendelser."""
     try:
         # Sørg for at klokkeslettene har riktig format (HH:MM)
         if len(start_klokkeslett.split(':')[0]) == 1:
@@ -138,47 +215,53 @@ def lag_kalenderhendelse(kalender, dato, start_klokkeslett, slutt_klokkeslett, v
         if len(slutt_klokkeslett.split(':')[0]) == 1:
             slutt_klokkeslett = f"0{slutt_klokkeslett}"
         
-        # Konverter start dato og tid til datetime-objekt
-        start_dato_tid = datetime.strptime(f"{dato} {start_klokkeslett}", "%d.%m.%Y %H:%M")
+        # Konverter start dato og tid til datetime-objekt (DD.MM.YYYY og HH:MM)
+        dag, måned, år = dato.split('.')
+        start_time, start_minutt = start_klokkeslett.split(':')
+        start_dato_tid = datetime(int(år), int(måned), int(dag), int(start_time), int(start_minutt))
         
         # Parse slutt-tid
-        slutt_time_obj = datetime.strptime(slutt_klokkeslett, "%H:%M")
+        slutt_time, slutt_minutt = (int(del_) for del_ in slutt_klokkeslett.split(':'))
         
         # Beregn slutt-dato/tid
         # Hvis slutt-time er mindre enn start-time, går vakten over midnatt
-        if slutt_time_obj.hour < start_dato_tid.hour or (slutt_time_obj.hour == start_dato_tid.hour and slutt_time_obj.minute < start_dato_tid.minute):
+        if (slutt_time, slutt_minutt) < (start_dato_tid.hour, start_dato_tid.minute):
             # Vakt går over midnatt - legg til 1 dag
             slutt_dato_tid = start_dato_tid + timedelta(days=1)
-            slutt_dato_tid = slutt_dato_tid.replace(hour=slutt_time_obj.hour, minute=slutt_time_obj.minute)
+            slutt_dato_tid = slutt_dato_tid.replace(hour=slutt_time, minute=slutt_minutt)
         else:
             # Vanlig vakt samme dag
-            slutt_dato_tid = start_dato_tid.replace(hour=slutt_time_obj.hour, minute=slutt_time_obj.minute)
-        
-        # Opprett hendelse
-        hendelse = Event()
-        hendelse.add('summary', f"{SHIFT_OWNER} jobber {vakttype}")
-        hendelse.add('dtstart', start_dato_tid)
-        hendelse.add('dtend', slutt_dato_tid)
-        hendelse.add('description', f'Vakt importert fra vaktplan-bilde via OCR\n{start_klokkeslett} - {slutt_klokkeslett}')
+            slutt_dato_tid = start_dato_tid.replace(hour=slutt_time, minute=slutt_minutt)
         
-        # Legg til hendelsen i kalenderen
-        kalender.add_component(hendelse)
-        print(f"[OK] La til vakt: {dato} {start_klokkeslett}-{slutt_klokkeslett} ({vakttype})")
+        # Opprett hendelsen og legg den til i kalenderen
+        hendelser.append(lag_vevent(
+            f"{SETTINGS.shift_owner} jobber {vakttype}",
+            start_dato_tid,
+            slutt_dato_tid,
+            f'Vakt importert fra vaktplan-bilde via OCR\n{start_klokkeslett} - {slutt_klokkeslett}',
+        ))
+        log.info("[OK] La til vakt: %s %s-%s (%s)", dato, start_klokkeslett, slutt_klokkeslett, vakttype)
         return True
     except ValueError as e:
-        print(f"[FEIL] Feil ved oppretting av kalenderhendelse: {e}")
+        log.error("[FEIL] Feil ved oppretting av kalenderhendelse: %s", e)
         return False
     except Exception as e:
-        print(f"[FEIL] Uventet feil: {e}")
+        log.error("[FEIL] Uventet feil: %s", e)
         return False
 
+def behandle_bilde(bilde_sti):
+    """Forbedrer bildet, kjører OCR og ekstraherer vaktene (kjøres i en egen prosess)."""
+    bilde = forbedre_bilde(bilde_sti)
+    tekst = pytesseract.image_to_string(bilde, lang=SETTINGS.ocr_language)
+    return ekstraher_dato_og_tid(tekst)
+
 def hovedfunksjon():
     """Hovedfunksjon som prosesserer alle vaktplan-bilder."""
     print("\n>>> Starter vaktplan-konvertering...\n")
     
     # Bruk konfigurasjonsverdier
-    bilde_mappe = INPUT_FOLDER
-    kalender_mappe = OUTPUT_FOLDER
+    bilde_mappe = SETTINGS.input_folder
+    kalender_mappe = SETTINGS.output_folder
 
     # Sjekk at mappene eksisterer
     if not os.path.exists(bilde_mappe):
@@ -187,7 +270,11 @@ def hovedfunksjon():
         return
     
     # Tell antall bilder
-    bilde_filer = [f for f in os.listdir(bilde_mappe) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    with os.scandir(bilde_mappe) as oppføringer:
+        bilde_filer = [
+            o.name for o in oppføringer
+            if o.is_file() and os.path.splitext(o.name)[1].lower() in BILDE_ENDELSER
+        ]
     if not bilde_filer:
         print(f"[ADVARSEL] Ingen bildefiler funnet i '{bilde_mappe}'-mappen")
         print(f"[TIP] Stoettede formater: .png, .jpg, .jpeg")
@@ -200,48 +287,48 @@ def hovedfunksjon():
         print(f"[INFO] Opprettet output-mappe: {kalender_mappe}\n")
 
     # Opprett én kalender for alle vakter
-    kalender = Calendar()
-    kalender.add('prodid', '-//Vaktplan Konverter//OCR til iCal//NO')
-    kalender.add('version', '2.0')
+    hendelser = []
     antall_vakter = 0
     antall_feilet = 0
 
-    # Behandle hvert bilde
-    for idx, bilde_fil in enumerate(bilde_filer, 1):
-        bilde_sti = os.path.join(bilde_mappe, bilde_fil)
-        print(f"[{idx}/{len(bilde_filer)}] Behandler: {bilde_fil}")
-        
-        try:
-            # Forbedre bilde og utfør OCR
-            bilde = forbedre_bilde(bilde_sti)
-            tekst = pytesseract.image_to_string(bilde, lang=OCR_LANGUAGE)
-            
-            # Ekstraher alle vakter fra bildet
-            vakter = ekstraher_dato_og_tid(tekst)
-            if vakter:
-                for dato, start_klokkeslett, slutt_klokkeslett in vakter:
-                    # Bestem vakttype basert på start- og slutt-tid
-                    vakttype = bestem_vakttype(start_klokkeslett, slutt_klokkeslett)
-                    
-                    # Legg til hendelsen i kalenderen
-                    if lag_kalenderhendelse(kalender, dato, start_klokkeslett, slutt_klokkeslett, vakttype):
-                        antall_vakter += 1
-            else:
-                print(f"[ADVARSEL] Ingen vakter funnet i {bilde_fil}")
+    # OCR er CPU-tung og Tesseract er entrådet, så bildene behandles i parallelle
+    # prosesser. Kalenderen bygges i hovedprosessen, i samme rekkefølge som filene.
+    with ProcessPoolExecutor() as executor:
+        oppgaver = [
+            executor.submit(behandle_bilde, os.path.join(bilde_mappe, bilde_fil))
+            for bilde_fil in bilde_filer
+        ]
+
+        for idx, (bilde_fil, oppgave) in enumerate(zip(bilde_filer, oppgaver), 1):
+            print(f"[{idx}/{len(bilde_filer)}] Behandler: {bilde_fil}")
+
+            try:
+                # Ekstraherte vakter fra bildet
+                vakter = oppgave.result()
+                if vakter:
+                    for dato, start_klokkeslett, slutt_klokkeslett in vakter:
+                        # Bestem vakttype basert på start- og slutt-tid
+                        vakttype = bestem_vakttype(start_klokkeslett, slutt_klokkeslett)
+
+                        # Legg til hendelsen i kalenderen
+                        if lag_kalenderhendelse(hendelser, dato, start_klokkeslett, slutt_klokkeslett, vakttype):
+                            antall_vakter += 1
+                else:
+                    print(f"[ADVARSEL] Ingen vakter funnet i {bilde_fil}")
+                    antall_feilet += 1
+
+            except Exception as e:
+                print(f"[FEIL] Feil ved behandling av {bilde_fil}: {e}")
                 antall_feilet += 1
-        
-        except Exception as e:
-            print(f"[FEIL] Feil ved behandling av {bilde_fil}: {e}")
-            antall_feilet += 1
-        
-        print()  # Blank linje mellom bilder
+
+            print()  # Blank linje mellom bilder
 
     # Lagre alle vakter i én fil
     print("="*60)
     if antall_vakter > 0:
         kalender_sti = os.path.join(kalender_mappe, "alle_vakter.ics")
         with open(kalender_sti, 'wb') as f:
-            f.write(kalender.to_ical())
+            f.write((KALENDER_START + ''.join(hendelser) + KALENDER_SLUTT).encode('utf-8'))
         print(f"[SUKSESS] Genererte kalenderfil: {kalender_sti}")
         print(f"[INFO] Totalt {antall_vakter} vakt(er) lagt til")
         if antall_feilet > 0:
@@ -255,4 +342,6 @@ def hovedfunksjon():
     print("="*60)
 
 if __name__ == "__main__":
+    # Valider at Tesseract er installert (bare når skriptet kjøres, ikke ved import)
+    sjekk_tesseract()
     hovedfunksjon() 
\ No newline at end of file